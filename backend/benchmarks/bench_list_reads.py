@@ -0,0 +1,99 @@
+"""Benchmark 200 concurrent readers of GET /api/calculations.
+
+Mongo is replaced by an in-memory collection with a fixed query latency, so
+the numbers show what coalescing saves in queries and per-document
+validation rather than real database timings. Run from the backend directory:
+
+    python benchmarks/bench_list_reads.py --readers 200 --latency-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "tests"))
+
+import server  # noqa: E402
+from conftest import MemoryCollection, MemoryDatabase  # noqa: E402
+
+
+class PassThroughCache:
+    async def get(self, key, load):
+        return await load()
+
+    def invalidate(self):
+        pass
+
+
+def make_docs(count):
+    request = server.CalculationRequest(
+        user_name="Bench", project_name="Bench", country="Germany", fence_type="OR", meters=1200, gates=4
+    )
+    start = datetime.now(timezone.utc)
+    docs = []
+    for i in range(count):
+        doc = server.calculate_pricing(request).model_dump()
+        doc["id"] = str(uuid.uuid4())
+        doc["timestamp"] = (start - timedelta(minutes=i)).isoformat()
+        docs.append(doc)
+    return docs
+
+
+async def run(readers, collection, cache):
+    server.db = MemoryDatabase()
+    server.db.calculations = collection
+    server.calculations_list_cache = cache
+    collection.queries = 0
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def read():
+            started = time.perf_counter()
+            response = await client.get("/api/calculations")
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(read() for _ in range(readers)))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(latencies)
+    return {
+        "queries": collection.queries,
+        "wall_ms": wall * 1000,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=200)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    collection = MemoryCollection(make_docs(args.docs), latency=args.latency_ms / 1000)
+    results = {
+        "uncoalesced": asyncio.run(run(args.readers, collection, PassThroughCache())),
+        "coalesced": asyncio.run(run(args.readers, collection, server.SingleFlightCache(ttl=server.LIST_CACHE_TTL))),
+    }
+
+    print(f"{args.readers} concurrent readers, {args.docs} documents, {args.latency_ms:g} ms query latency")
+    for name, result in results.items():
+        print(
+            f"{name:>12}: {result['queries']:4d} queries  wall {result['wall_ms']:8.1f} ms  "
+            f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Request coalescing for read-heavy endpoints.
+
+Concurrent callers asking for the same key share one in-flight load, and the
+result is kept for a short TTL. Writers call ``invalidate`` so that any read
+starting after a write sees it: cached values are dropped, in-flight loads
+that began before the write are detached from new callers, and their results
+are not cached.
+
+The cache is per process. With several workers, the TTL bounds how long one
+worker can serve a list that another worker has already changed.
+"""
+import asyncio
+import time
+
+
+class SingleFlightCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._cache = {}
+        self._inflight = {}
+        self._generation = 0
+
+    async def get(self, key, load):
+        """Return the value for ``key``, calling ``load()`` only if no one else is."""
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, load, self._generation))
+            self._inflight[key] = task
+        # Shielded so a caller that disconnects does not cancel the shared load
+        return await asyncio.shield(task)
+
+    async def _load(self, key, load, generation):
+        try:
+            value = await load()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        if generation == self._generation and self.ttl > 0:
+            self._cache[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self):
+        self._generation += 1
+        self._cache.clear()
+        self._inflight.clear()
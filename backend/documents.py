@@ -0,0 +1,223 @@
+"""Quote documents for archived calculations.
+
+Quotes are rendered to standalone HTML and cached on local disk under the
+SHA-256 of the template version and the calculation content, so a quote is
+only rendered again when it changes. The cache is size bounded and evicts
+the least recently used documents first. Callers get the document bytes
+rather than a path, so eviction by another request cannot pull a file out
+from under a response that is still being built.
+"""
+import asyncio
+import hashlib
+import html
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DOCUMENT_TEMPLATE_VERSION = "1"
+
+STANDARD_BREAKDOWN_ROWS = [
+    ("work_days", "Work days", "number"),
+    ("daily_rate_per_man", "Daily rate per man", "money"),
+    ("labor_cost", "Labour", "money"),
+    ("tools_cost", "Tools", "money"),
+    ("supervision_cost", "Supervision", "money"),
+    ("flight_ticket", "Flight ticket", "money"),
+    ("ground_fixing_cost", "Ground fixing", "money"),
+]
+
+UK_BREAKDOWN_ROWS = [
+    ("work_days", "Work days", "number"),
+    ("num_labourers", "Labourers", "count"),
+    ("daily_rate_per_man", "Daily rate per man", "money"),
+    ("labor_cost", "Labour", "money"),
+    ("tools_cost", "Tools", "money"),
+    ("accommodation_cost", "Accommodation", "money"),
+    ("transportation_cost", "Transportation", "money"),
+    ("concrete_cost", "Concrete", "money"),
+]
+
+PRICE_ROWS = [
+    ("raw_total", "Raw total"),
+    ("rate_per_meter", "Rate per meter"),
+    ("markup_30", "30% markup"),
+    ("markup_40", "40% markup"),
+    ("markup_50", "50% markup"),
+    ("markup_60", "60% markup"),
+]
+
+_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; color: #0f172a; margin: 40px; }
+header { border-bottom: 3px solid #2D4A2B; margin-bottom: 24px; }
+h1 { color: #2D4A2B; margin: 0 0 8px; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 24px; }
+th, td { text-align: left; padding: 6px 8px; border-bottom: 1px solid #e2e8f0; }
+td.amount { text-align: right; font-family: monospace; }
+"""
+
+
+def _format_value(value, kind):
+    if value is None:
+        return "-"
+    if kind == "money":
+        return f"£{float(value):,.2f}"
+    if kind == "number":
+        return f"{float(value):,.2f}".rstrip("0").rstrip(".")
+    return html.escape(str(value))
+
+
+def _rows(pairs):
+    return "\n".join(
+        f"<tr><th>{html.escape(label)}</th><td class=\"amount\">{value}</td></tr>" for label, value in pairs
+    )
+
+
+def render_quote_html(calculation: dict) -> str:
+    """Render a stored Calculation or UKCalculation as a standalone HTML quote."""
+    is_uk = calculation.get("calculator_type") == "uk"
+    breakdown = calculation.get("breakdown", {})
+
+    details = [
+        ("Project", html.escape(str(calculation.get("project_name", "")))),
+        ("Fence type", html.escape(str(calculation.get("fence_type", "")))),
+        ("Meters", _format_value(calculation.get("meters"), "number")),
+        ("Gates", _format_value(calculation.get("gates"), "count")),
+    ]
+    if is_uk:
+        details.append(("Delivery lead", _format_value(calculation.get("delivery_lead"), "text")))
+        if calculation.get("delivery_copilot"):
+            details.append(("Delivery co-pilot", _format_value(calculation.get("delivery_copilot"), "text")))
+    else:
+        details.append(("Country", html.escape(str(calculation.get("country", "")))))
+        details.append(("Ground fixing", _format_value(calculation.get("ground_fixing_method"), "text")))
+    details.append(("Prepared by", _format_value(calculation.get("user_name"), "text")))
+    details.append(("Date", html.escape(str(calculation.get("timestamp", ""))[:10])))
+
+    breakdown_rows = UK_BREAKDOWN_ROWS if is_uk else STANDARD_BREAKDOWN_ROWS
+    costs = [(label, _format_value(breakdown.get(key), kind)) for key, label, kind in breakdown_rows]
+    prices = [(label, _format_value(breakdown.get(key), "money")) for key, label in PRICE_ROWS]
+
+    title = f"Installation quote - {calculation.get('project_name', '')}"
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>{_STYLE}</style>
+</head>
+<body>
+<header>
+<h1>{html.escape(title)}</h1>
+<p>Quote reference {html.escape(str(calculation.get("id", "")))}</p>
+</header>
+<h2>Project</h2>
+<table>
+{_rows(details)}
+</table>
+<h2>Cost breakdown</h2>
+<table>
+{_rows(costs)}
+</table>
+<h2>Pricing</h2>
+<table>
+{_rows(prices)}
+</table>
+</body>
+</html>
+"""
+
+
+def document_key(calculation: dict) -> str:
+    payload = json.dumps(calculation, sort_keys=True, default=str)
+    return hashlib.sha256(f"{DOCUMENT_TEMPLATE_VERSION}:{payload}".encode()).hexdigest()
+
+
+class DocumentCache:
+    """Content-addressed HTML documents on disk with LRU eviction by size."""
+
+    def __init__(self, directory: Path, max_bytes: int, workers: int = 4):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="documents")
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+
+        # Left behind by writes that were interrupted
+        for path in self.directory.glob("*.tmp"):
+            path.unlink(missing_ok=True)
+
+        # Hits touch the file, so modification time orders entries by last use
+        existing = sorted(self.directory.glob("*.html"), key=lambda path: path.stat().st_mtime)
+        for path in existing:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        # The budget may have been lowered since these were written
+        self._evict()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.html"
+
+    def get_or_render(self, calculation: dict) -> bytes:
+        """Return the cached document for a calculation, rendering it on a miss."""
+        key = document_key(calculation)
+        path = self.path_for(key)
+
+        with self._lock:
+            cached = key in self._entries
+            if cached:
+                self._entries.move_to_end(key)
+        if cached:
+            try:
+                content = path.read_bytes()
+                os.utime(path)
+                return content
+            except FileNotFoundError:
+                # Evicted since the lookup; render it again
+                pass
+
+        content = render_quote_html(calculation).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total_bytes += len(content) - self._entries.pop(key, 0)
+            self._entries[key] = len(content)
+            self._evict()
+        return content
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self.path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    async def render(self, calculation: dict) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.get_or_render, calculation)
+
+    async def render_many(self, calculations):
+        """Render or fetch documents for several calculations on the worker pool."""
+        return await asyncio.gather(*(self.render(calculation) for calculation in calculations))
+
+
+def build_zip(files) -> bytes:
+    """Bundle (archive name, content) pairs into an in-memory zip file."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+    return buffer.getvalue()
@@ -0,0 +1,193 @@
+"""Structured, non-blocking logging for the API.
+
+Records are put on a bounded in-memory queue by the request handlers and
+written out as JSON lines by a QueueListener thread, so log I/O never runs on
+the event loop. Messages stay as %-style templates until the listener formats
+them, and repeated records from the same call site are rate limited before
+they are queued.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Uvicorn gives these their own handlers and stops them propagating; they are
+# sent through the root queue instead so nothing is written from the event loop
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+# One record per request by design, so never rate limited
+ACCESS_LOGGER = "uvicorn.access"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+# Uvicorn adds an ANSI coloured copy of some messages, which is dropped too
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "suppressed", "color_message"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the correlation id of the request being served."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit repeated records from the same call site.
+
+    Each (logger, template, line) key may log ``burst`` records per
+    ``interval`` seconds. After that only every ``sample_every``-th record
+    gets through, carrying the number suppressed since the last one. Records
+    at ERROR and above, and loggers listed in ``exempt``, are never
+    dropped. Windows idle for a whole interval
+    after expiring are pruned, so call sites that go quiet are forgotten
+    along with any suppressed count they still carry.
+    """
+
+    def __init__(self, burst=10, interval=60.0, sample_every=100, exempt=()):
+        super().__init__()
+        self.exempt = frozenset(exempt)
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._pruned_at = time.monotonic()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR or record.name in self.exempt:
+            return True
+
+        key = (record.name, record.msg, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._pruned_at >= self.interval:
+                self._prune(now)
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            else:
+                window[1] += 1
+                if window[1] <= self.burst or (window[1] - self.burst) % self.sample_every == 0:
+                    suppressed = window[2]
+                    window[2] = 0
+                else:
+                    window[2] += 1
+                    return False
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _prune(self, now):
+        self._windows = {
+            key: window for key, window in self._windows.items() if now - window[0] < 2 * self.interval
+        }
+        self._pruned_at = now
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never formats or blocks in the caller.
+
+    The stock handler renders the message before queueing it; here the record
+    is queued as-is and rendered by the listener thread. When the queue is
+    full the record is dropped and counted instead of waiting, and the count
+    is logged as a warning once the queue has room again.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        # Called under the handler lock, so the counters need no lock of their own
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Dropped %d log records while the queue was full",
+                    "args": (self._unreported,),
+                }))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+_listener = None
+
+
+def configure_logging(level=logging.INFO, stream=None, queue_size=10_000):
+    """Route the root logger, and uvicorn's loggers, through a queue to a JSON stream handler.
+
+    Safe to call more than once; later calls return the running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.Queue(maxsize=queue_size)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(RateLimitFilter(exempt=(ACCESS_LOGGER,)))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for existing in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(existing)
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
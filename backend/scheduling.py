@@ -0,0 +1,260 @@
+"""Season-wide crew scheduling for UK installation jobs.
+
+Jobs are placed on a day grid with a serial schedule generation scheme: in
+priority order, each job takes the crew size and delivery lead that best serve
+the objective, starting on the earliest day where enough labourers and the
+required people are free. A local search then reorders the priority list
+and keeps any order that schedules at least as well, re-placing only the jobs
+from the first moved position onwards. It stops when moves stop improving
+the schedule or the time limit is reached.
+"""
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+OBJECTIVES = ("makespan", "cost")
+CHECKPOINT_EVERY = 16
+MAX_STALE_MOVES = 300
+
+
+@dataclass
+class ScheduleJob:
+    id: str
+    worker_days: float
+    release_day: int
+    due_day: Optional[int]
+    fixed_cost: float
+    cost_per_man_day: float
+    cost_per_day: float
+    max_days: Optional[int] = None
+    lead: Optional[str] = None
+    copilot: Optional[str] = None
+
+
+@dataclass
+class Placement:
+    job_id: str
+    start_day: int
+    work_days: int
+    num_labourers: int
+    lead: Optional[str]
+    copilot: Optional[str]
+    cost: float
+    late_days: int
+
+
+def crew_modes(job: ScheduleJob, crew_headcount: int):
+    """Return (num_labourers, work_days, cost) options for a job.
+
+    Crews are even and at least two, as in calculate_uk_pricing. Only the
+    smallest crew for each distinct duration is kept, since a bigger crew
+    finishing on the same day costs more and blocks more labourers.
+    """
+    modes = []
+    seen_days = set()
+    for num_labourers in range(2, crew_headcount + 1, 2):
+        work_days = math.ceil(job.worker_days / num_labourers)
+        if work_days in seen_days:
+            continue
+        if job.max_days is not None and work_days > job.max_days:
+            continue
+        seen_days.add(work_days)
+        cost = job.fixed_cost + work_days * (num_labourers * job.cost_per_man_day + job.cost_per_day)
+        modes.append((num_labourers, work_days, cost))
+
+    if not modes:
+        # Nothing meets the time limit with the crew we have; use the biggest crew
+        num_labourers = crew_headcount - crew_headcount % 2
+        work_days = math.ceil(job.worker_days / num_labourers)
+        cost = job.fixed_cost + work_days * (num_labourers * job.cost_per_man_day + job.cost_per_day)
+        modes.append((num_labourers, work_days, cost))
+    return modes
+
+
+def _free_windows(blocked, start: int, stop: int, duration: int):
+    """For each day in [start, stop], whether ``duration`` days from it are unblocked.
+
+    ``blocked`` may be 2-D, one row per person, in which case each row is
+    checked separately.
+    """
+    window = blocked[..., start:stop + duration]
+    counts = np.cumsum(window, axis=-1)
+    counts = np.concatenate((np.zeros(counts.shape[:-1] + (1,), dtype=counts.dtype), counts), axis=-1)
+    return counts[..., duration:duration + stop - start + 1] - counts[..., :stop - start + 1] == 0
+
+
+class _Season:
+    def __init__(self, horizon: int, crew_headcount: int, people: Sequence[str]):
+        self.crew_headcount = crew_headcount
+        self.person_index = {person: index for index, person in enumerate(people)}
+        self.usage = np.zeros(horizon, dtype=np.int32)
+        self.busy = np.zeros((len(people), horizon), dtype=bool)
+        self.lead_load = np.zeros(len(people), dtype=np.int64)
+        self.frontier = 0
+
+    def copy(self):
+        season = _Season.__new__(_Season)
+        season.crew_headcount = self.crew_headcount
+        season.person_index = self.person_index
+        season.usage = self.usage.copy()
+        season.busy = self.busy.copy()
+        season.lead_load = self.lead_load.copy()
+        season.frontier = self.frontier
+        return season
+
+    def place(self, job: ScheduleJob, modes, leads: Sequence[str], objective: str) -> Placement:
+        start = job.release_day
+        stop = max(start, self.frontier)
+        # An auto-assigned lead must be someone other than the job's co-pilot
+        lead_options = [job.lead] if job.lead else [lead for lead in leads if lead != job.copilot]
+        lead_rows = [self.person_index[lead] for lead in lead_options]
+
+        best = None
+        best_key = None
+        for num_labourers, work_days, cost in modes:
+            free = _free_windows(self.usage > self.crew_headcount - num_labourers, start, stop, work_days)
+            if job.copilot:
+                free &= _free_windows(self.busy[self.person_index[job.copilot]], start, stop, work_days)
+
+            if lead_rows:
+                candidates = zip(lead_options, free & _free_windows(self.busy[lead_rows], start, stop, work_days))
+            else:
+                candidates = [(None, free)]
+
+            for lead, lead_free in candidates:
+                first = int(np.argmax(lead_free))
+                if not lead_free[first]:
+                    continue
+                start_day = start + first
+                finish = start_day + work_days
+                late_days = max(0, finish - 1 - job.due_day) if job.due_day is not None else 0
+                load = self.lead_load[self.person_index[lead]] if lead is not None else 0
+                if objective == "cost":
+                    key = (late_days, cost, finish, load)
+                else:
+                    key = (late_days, finish, cost, load)
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best = Placement(job.id, start_day, work_days, num_labourers, lead, job.copilot, cost, late_days)
+
+        finish = best.start_day + best.work_days
+        self.usage[best.start_day:finish] += best.num_labourers
+        for person in (best.lead, best.copilot):
+            if person is not None:
+                self.busy[self.person_index[person], best.start_day:finish] = True
+        if best.lead is not None:
+            self.lead_load[self.person_index[best.lead]] += best.work_days
+        self.frontier = max(self.frontier, finish)
+        return best
+
+
+def _score(placements: List[Placement], objective: str):
+    late_days = sum(p.late_days for p in placements)
+    makespan = max((p.start_day + p.work_days for p in placements), default=0)
+    cost = sum(p.cost for p in placements)
+    if objective == "cost":
+        return (late_days, round(cost, 2), makespan)
+    return (late_days, makespan, round(cost, 2))
+
+
+def schedule_jobs(
+    jobs: List[ScheduleJob],
+    crew_headcount: int,
+    leads: Sequence[str] = (),
+    objective: str = "makespan",
+    time_limit: float = 2.0,
+    seed: int = 42,
+):
+    """Allocate crews and leads to jobs, minimizing lateness then ``objective``.
+
+    Returns the placements in job input order and the (late_days, primary,
+    secondary) score of the best schedule found.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    if crew_headcount < 2:
+        raise ValueError("Crew headcount must be at least 2")
+    if not jobs:
+        return [], _score([], objective)
+
+    modes = {job.id: crew_modes(job, crew_headcount) for job in jobs}
+    people = set(leads)
+    for job in jobs:
+        people.update(person for person in (job.lead, job.copilot) if person)
+    people = sorted(people)
+    horizon = max(job.release_day for job in jobs) + sum(max(m[1] for m in modes[job.id]) for job in jobs) + 1
+    deadline = time.perf_counter() + time_limit
+
+    def build(order, first_changed=0, base=None):
+        """Place jobs in order, reusing ``base`` for the positions before ``first_changed``.
+
+        Returns (placements, checkpoints), or None if the deadline passes.
+        A checkpoint is the season state before every CHECKPOINT_EVERY-th job.
+        """
+        if base is None:
+            begin = 0
+            season = _Season(horizon, crew_headcount, people)
+            placements, checkpoints = [], []
+        else:
+            base_placements, base_checkpoints = base
+            checkpoint = first_changed // CHECKPOINT_EVERY
+            begin = checkpoint * CHECKPOINT_EVERY
+            season = base_checkpoints[checkpoint].copy()
+            placements, checkpoints = base_placements[:begin], base_checkpoints[:checkpoint]
+
+        for index in range(begin, len(order)):
+            if index % CHECKPOINT_EVERY == 0:
+                checkpoints.append(season.copy())
+            if base is not None and time.perf_counter() > deadline:
+                return None
+            placements.append(season.place(order[index], modes[order[index].id], leads, objective))
+        return placements, checkpoints
+
+    # Earliest due date first, then earliest release, then biggest job
+    order = sorted(
+        jobs,
+        key=lambda job: (
+            job.due_day if job.due_day is not None else horizon,
+            job.release_day,
+            -job.worker_days,
+        ),
+    )
+    best = build(order)
+    best_score = _score(best[0], objective)
+
+    # Stop once a run of moves brings no strict improvement; for tiny inputs
+    # that is roughly when every swap has been tried
+    patience = min(len(order) * (len(order) - 1), MAX_STALE_MOVES)
+    stale_moves = 0
+    rng = random.Random(seed)
+    while len(order) > 1 and stale_moves < patience:
+        candidate = list(order)
+        late = [i for i, p in enumerate(best[0]) if p.late_days > 0 and i > 0]
+        if late and rng.random() < 0.5:
+            # Pull a late job forward so it gets first pick of crews and leads
+            i = rng.choice(late)
+            j = rng.randrange(i)
+            candidate.insert(j, candidate.pop(i))
+        elif rng.random() < 0.5:
+            i, j = rng.sample(range(len(candidate)), 2)
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        else:
+            i, j = rng.sample(range(len(candidate)), 2)
+            candidate.insert(j, candidate.pop(i))
+
+        result = build(candidate, min(i, j), best)
+        if result is None:
+            break
+        score = _score(result[0], objective)
+        stale_moves = 0 if score < best_score else stale_moves + 1
+        if score <= best_score:
+            order = candidate
+            best = result
+            best_score = score
+
+    by_id: Dict[str, Placement] = {p.job_id: p for p in best[0]}
+    return [by_id[job.id] for job in jobs], best_score
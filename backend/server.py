@@ -1,6 +1,8 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -8,12 +10,22 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import math
 import certifi
+import hashlib
+import json
 import ssl
+import asyncio
+
+from coalescing import SingleFlightCache
+from documents import DocumentCache, build_zip
+from logging_config import configure_logging, request_id_var, shutdown_logging
+from risk import sample_work_days, summarize_risk
+from scheduling import ScheduleJob, schedule_jobs
+from snapshot import snapshot_archive
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -37,11 +49,22 @@ else:
 
 db = client[db_name]
 
-logging.basicConfig(level=logging.INFO)
+configure_logging(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
-logger.info(f"MongoDB configured: {db_name}")
+logger.info("MongoDB configured: %s", db_name)
 
 app = FastAPI()
+
+# Concurrent archive list reads share one query and one response body
+LIST_CACHE_TTL = float(os.environ.get('LIST_CACHE_TTL', 2.0))
+calculations_list_cache = SingleFlightCache(ttl=LIST_CACHE_TTL)
+uk_calculations_list_cache = SingleFlightCache(ttl=LIST_CACHE_TTL)
+
+document_cache = DocumentCache(
+    directory=Path(os.environ.get('DOCUMENT_CACHE_DIR', ROOT_DIR / 'document_cache')),
+    max_bytes=int(os.environ.get('DOCUMENT_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    workers=int(os.environ.get('DOCUMENT_WORKERS', 4)),
+)
 api_router = APIRouter(prefix="/api")
 uk_router = APIRouter(prefix="/api/uk")
 
@@ -78,6 +101,61 @@ COUNTRY_MIN_WAGES = {
     "New Zealand": 22.70,
 }
 
+FENCE_DAILY_CAPACITY = {
+    "OR": 136,
+    "PR1": 136,
+    "PR2": 128
+}
+FALLBACK_MIN_WAGE = 15.00
+GATE_DAYS_PER_GATE = 0.25
+SETUP_CLEANUP_DAYS = 1
+LABOR_RATE_MULTIPLIER = 2
+HOURS_PER_DAY = 8
+CREW_SIZE = 8
+TOOLS_BASE_COST = 200
+TOOLS_COST_PER_DAY = 100
+SUPERVISION_COST_PER_DAY = 250
+FLIGHT_TICKET_COST = 500
+DEFAULT_GROUND_FIXING_METHOD = "Angle Steel"
+GROUND_FIXING_COST_PER_METER = {
+    "Angle Steel": 1.0,
+    "Inner GMS Post with Baseplate": 0.078
+}
+
+# Breakdown fields priced as a multiple of raw_total, shared by both calculators
+PRICE_MULTIPLIERS = {
+    "markup_30": 1.30,
+    "markup_40": 1.40,
+    "markup_50": 1.50,
+    "markup_60": 1.60,
+    "bad_case_20": 1.20,
+    "more_bad_case_40": 1.40,
+    "worst_case_80": 1.80
+}
+
+def calculate_price_multiples(raw_total: float):
+    return {field: round(raw_total * multiplier, 2) for field, multiplier in PRICE_MULTIPLIERS.items()}
+
+class RiskSettings(BaseModel):
+    # Capped so a preview's simulation stays within tens of milliseconds
+    samples: int = Field(default=100_000, ge=1_000, le=200_000)
+    seed: int = 42
+    # (low, mode, high) triangular parameters
+    productivity_factor: Tuple[float, float, float] = (0.7, 1.0, 1.1)
+    gate_hours: Tuple[float, float, float] = (1.5, 2.0, 4.0)
+    # Expected weather days lost per planned work day
+    weather_day_rate: float = Field(default=0.1, ge=0)
+
+class RiskSummary(BaseModel):
+    samples: int
+    seed: int
+    days_p50: float
+    days_p80: float
+    days_p95: float
+    cost_p50: float
+    cost_p80: float
+    cost_p95: float
+
 class CalculationRequest(BaseModel):
     user_name: str
     project_name: str
@@ -86,6 +164,7 @@ class CalculationRequest(BaseModel):
     meters: float
     gates: int
     ground_fixing_method: str = "Angle Steel"
+    risk: Optional[RiskSettings] = None
 
 class CostBreakdown(BaseModel):
     work_days: float
@@ -104,6 +183,7 @@ class CostBreakdown(BaseModel):
     bad_case_20: float
     more_bad_case_40: float
     worst_case_80: float
+    risk: Optional[RiskSummary] = None
 
 class Calculation(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -134,52 +214,80 @@ async def health_check():
 async def get_countries():
     return {"countries": sorted(list(COUNTRY_MIN_WAGES.keys()))}
 
+def validate_risk_settings(risk: RiskSettings):
+    for name in ("productivity_factor", "gate_hours"):
+        low, mode, high = getattr(risk, name)
+        if not 0 <= low <= mode <= high or low == high:
+            raise HTTPException(status_code=400, detail=f"Invalid risk {name}: expected 0 <= low <= mode <= high and low < high")
+    if risk.productivity_factor[0] == 0:
+        raise HTTPException(status_code=400, detail="Invalid risk productivity_factor: low must be above 0")
+
 def calculate_pricing(request: CalculationRequest):
     """Helper function to calculate pricing without saving to database"""
     if request.country not in COUNTRY_MIN_WAGES:
         raise HTTPException(status_code=400, detail="Invalid country selected")
     
+    if request.fence_type not in FENCE_DAILY_CAPACITY:
+        raise HTTPException(status_code=400, detail="Invalid fence type selected")
+    
     min_wage = COUNTRY_MIN_WAGES[request.country]
     
     if min_wage == 0:
-        min_wage = 15.00
+        min_wage = FALLBACK_MIN_WAGE
     
-    fence_types = {
-"OR":136,
-"PR1":136,
-"PR2":128}
- 
-    daily_capacity = fence_types[request.fence_type]
+    daily_capacity = FENCE_DAILY_CAPACITY[request.fence_type]
     
     fence_days = request.meters / daily_capacity
-    gate_days = request.gates * 0.25
-    setup_cleanup_days = 1
+    gate_days = request.gates * GATE_DAYS_PER_GATE
+    setup_cleanup_days = SETUP_CLEANUP_DAYS
     total_work_days_calculated = fence_days + gate_days + setup_cleanup_days
     
     total_work_days = math.ceil(total_work_days_calculated)
     
-    hourly_labor_rate = 2 * min_wage
-    daily_rate_per_man = hourly_labor_rate * 8
-    daily_labor_cost = 8 * daily_rate_per_man
+    hourly_labor_rate = LABOR_RATE_MULTIPLIER * min_wage
+    daily_rate_per_man = hourly_labor_rate * HOURS_PER_DAY
+    daily_labor_cost = CREW_SIZE * daily_rate_per_man
     total_labor_cost = daily_labor_cost * total_work_days
     
-    tools_base = 200
-    tools_daily = 100 * total_work_days
+    tools_base = TOOLS_BASE_COST
+    tools_daily = TOOLS_COST_PER_DAY * total_work_days
     total_tools_cost = tools_base + tools_daily
     
-    supervision_daily = 250 * total_work_days
-    flight_ticket = 500
+    supervision_daily = SUPERVISION_COST_PER_DAY * total_work_days
+    flight_ticket = FLIGHT_TICKET_COST
     total_supervision_cost = supervision_daily
     
-    if request.ground_fixing_method == "Inner GMS Post with Baseplate":
-        ground_fixing_cost = request.meters * 0.078
-    else:
-        # Default is Angle Steel
-        ground_fixing_cost = request.meters * 1.0
+    # Unknown methods are priced as the default, Angle Steel
+    ground_fixing_rate = GROUND_FIXING_COST_PER_METER.get(
+        request.ground_fixing_method, GROUND_FIXING_COST_PER_METER[DEFAULT_GROUND_FIXING_METHOD]
+    )
+    ground_fixing_cost = request.meters * ground_fixing_rate
     
     raw_total = total_labor_cost + total_tools_cost + total_supervision_cost + flight_ticket + ground_fixing_cost
     rate_per_meter = raw_total / request.meters
     
+    risk = None
+    if request.risk:
+        validate_risk_settings(request.risk)
+        work_days = sample_work_days(
+            meters=request.meters,
+            gates=request.gates,
+            daily_capacity=daily_capacity,
+            crew_multiplier=1,
+            crew_size=1,
+            productivity_factor=request.risk.productivity_factor,
+            gate_hours=request.risk.gate_hours,
+            weather_day_rate=request.risk.weather_day_rate,
+            samples=request.risk.samples,
+            seed=request.risk.seed,
+        )
+        risk = summarize_risk(
+            work_days,
+            fixed_cost=tools_base + flight_ticket + ground_fixing_cost,
+            cost_per_day=daily_labor_cost + TOOLS_COST_PER_DAY + SUPERVISION_COST_PER_DAY,
+            seed=request.risk.seed,
+        )
+    
     breakdown = CostBreakdown(
         work_days=float(total_work_days),
         daily_rate_per_man=round(daily_rate_per_man, 2),
@@ -190,10 +298,8 @@ def calculate_pricing(request: CalculationRequest):
         ground_fixing_cost=round(ground_fixing_cost, 2),
         raw_total=round(raw_total, 2),
         rate_per_meter=round(rate_per_meter, 2),
-        markup_30=round(raw_total * 1.30, 2),
-        markup_40=round(raw_total * 1.40, 2),
-        markup_50=round(raw_total * 1.50, 2),
-        markup_60=round(raw_total * 1.60, 2)
+        **calculate_price_multiples(raw_total),
+        risk=risk
     )
     
     calculation = Calculation(
@@ -212,16 +318,43 @@ def calculate_pricing(request: CalculationRequest):
 @api_router.post("/calculate-preview", response_model=CalculationResponse)
 async def calculate_preview(request: CalculationRequest):
     """Calculate pricing without saving to database"""
-    calculation = calculate_pricing(request)
+    if request.risk:
+        # The Monte Carlo simulation takes milliseconds; keep it off the event loop
+        calculation = await run_in_threadpool(calculate_pricing, request)
+    else:
+        calculation = calculate_pricing(request)
     return {"calculation": calculation}
 
+def reprice_calculation(calculation: Calculation) -> Calculation:
+    """Rebuild a posted calculation from its inputs with the current rates.
+
+    Clients price previews from a cached pricing model, so the breakdown they
+    post may use old rates or have been edited. Only the inputs, id and
+    timestamp are kept; a risk summary cannot be rebuilt from them and is dropped.
+    """
+    repriced = calculate_pricing(CalculationRequest(
+        user_name=calculation.user_name,
+        project_name=calculation.project_name,
+        country=calculation.country,
+        fence_type=calculation.fence_type,
+        meters=calculation.meters,
+        gates=calculation.gates,
+        ground_fixing_method=calculation.ground_fixing_method or DEFAULT_GROUND_FIXING_METHOD,
+    ))
+    if repriced.breakdown != calculation.breakdown.model_copy(update={"risk": None}):
+        logger.warning("Repriced calculation %s: posted breakdown does not match current rates", calculation.id)
+    return repriced.model_copy(update={"id": calculation.id, "timestamp": calculation.timestamp})
+
 @api_router.post("/archive", response_model=CalculationResponse)
 async def archive_calculation(calculation: Calculation):
     """Save calculation to archive"""
+    calculation = reprice_calculation(calculation)
     doc = calculation.model_dump()
     doc['timestamp'] = doc['timestamp'].isoformat()
+    doc['archived_at'] = datetime.now(timezone.utc).isoformat()
     
     await db.calculations.insert_one(doc)
+    calculations_list_cache.invalidate()
     
     return {"calculation": calculation}
 
@@ -235,44 +368,53 @@ async def delete_calculations(request: DeleteRequest):
         result = await db.calculations.delete_many({"id": {"$in": request.ids}})
         return {"deleted_count": result.deleted_count, "ids": request.ids}
     except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error deleting calculations: {e}")
+        logger.error("Error deleting calculations: %s", e)
         raise HTTPException(status_code=500, detail="Failed to delete calculations")
+    finally:
+        calculations_list_cache.invalidate()
+
+def parse_calculation(calc: dict) -> Calculation:
+    """Validate a stored calculation document, upgrading older documents"""
+    if isinstance(calc['timestamp'], str):
+        calc['timestamp'] = datetime.fromisoformat(calc['timestamp'])
+    
+    # Add default values for new fields if they don't exist (backwards compatibility)
+    if 'ground_fixing_method' not in calc:
+        calc['ground_fixing_method'] = "Angle Steel"
+
+    if 'breakdown' in calc:
+        if 'daily_rate_per_man' not in calc['breakdown']:
+            calc['breakdown']['daily_rate_per_man'] = 0.0
+        
+        # Migrate old ground_fixing_screws to ground_fixing_cost
+        if 'ground_fixing_screws' in calc['breakdown'] and 'ground_fixing_cost' not in calc['breakdown']:
+            calc['breakdown']['ground_fixing_cost'] = calc['breakdown'].pop('ground_fixing_screws', 0.0)
+        elif 'ground_fixing_cost' not in calc['breakdown']:
+            calc['breakdown']['ground_fixing_cost'] = 0.0
+    
+    return Calculation(**calc)
+
+def serialize_list(items) -> bytes:
+    return json.dumps(jsonable_encoder(items)).encode()
 
 @api_router.get("/calculations")
 async def get_calculations():
+    body = await calculations_list_cache.get("latest", load_calculations_list)
+    return Response(body, media_type="application/json")
+
+async def load_calculations_list():
     calculations = await db.calculations.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
     
     result = []
     for calc in calculations:
         try:
-            if isinstance(calc['timestamp'], str):
-                calc['timestamp'] = datetime.fromisoformat(calc['timestamp'])
-            
-            # Add default values for new fields if they don't exist (backwards compatibility)
-            if 'ground_fixing_method' not in calc:
-                calc['ground_fixing_method'] = "Angle Steel"
-
-            if 'breakdown' in calc:
-                if 'daily_rate_per_man' not in calc['breakdown']:
-                    calc['breakdown']['daily_rate_per_man'] = 0.0
-                
-                # Migrate old ground_fixing_screws to ground_fixing_cost
-                if 'ground_fixing_screws' in calc['breakdown'] and 'ground_fixing_cost' not in calc['breakdown']:
-                    calc['breakdown']['ground_fixing_cost'] = calc['breakdown'].pop('ground_fixing_screws', 0.0)
-                elif 'ground_fixing_cost' not in calc['breakdown']:
-                    calc['breakdown']['ground_fixing_cost'] = 0.0
-            
-            # Validate and convert to Calculation model
-            validated_calc = Calculation(**calc)
-            result.append(validated_calc.model_dump())
+            result.append(parse_calculation(calc).model_dump())
         except Exception as e:
             # Skip invalid calculations
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Skipping invalid calculation: {e}")
+            logger.warning("Skipping invalid calculation %s: %s", calc.get('id'), e)
             continue
     
-    return result
+    return serialize_list(result)
 
 class UKCalculationRequest(BaseModel):
     user_name: str
@@ -285,6 +427,7 @@ class UKCalculationRequest(BaseModel):
     num_labourers: Optional[int] = None
     delivery_lead: Optional[str] = None
     delivery_copilot: Optional[str] = None
+    risk: Optional[RiskSettings] = None
 
 class UKCostBreakdown(BaseModel):
     work_days: float
@@ -304,6 +447,7 @@ class UKCostBreakdown(BaseModel):
     bad_case_20: float
     more_bad_case_40: float
     worst_case_80: float
+    risk: Optional[RiskSummary] = None
 
 class UKCalculation(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -330,6 +474,14 @@ UK_DAILY_RATE_PER_MAN = 200.0
 UK_ACCOMMODATION_PER_DAY_PER_MAN = 75.0
 UK_TRANSPORTATION_COST = 250.0
 UK_CONCRETE_COST_PER_METER = 2.0
+UK_TOOLS_BASE_COST = 200.0
+UK_TOOLS_COST_PER_DAY = 100.0
+UK_CONCRETE_FENCE_TYPES = ["PR", "CM", "CT", "HM"]
+UK_PRODUCTIVITY_CREW_SIZE = 2
+UK_GATE_HOURS_PER_GATE = 2
+UK_HOURS_PER_DAY = 8
+UK_SETUP_CLEANUP_DAYS = 1
+UK_MIN_LABOURERS = 2
 UK_FENCE_PRODUCTIVITY = {
     "OR": 270,
     "PR": 60,
@@ -338,54 +490,83 @@ UK_FENCE_PRODUCTIVITY = {
     "HM": 60
 }
 
-def calculate_uk_pricing(request: UKCalculationRequest):
-    """Calculate UK-specific pricing"""
-    if request.fence_type not in UK_FENCE_PRODUCTIVITY:
+def calculate_uk_worker_days(fence_type: str, meters: float, gates: int):
+    """Worker-days needed for a UK job, based on 2-man crew productivity"""
+    if fence_type not in UK_FENCE_PRODUCTIVITY:
         raise HTTPException(status_code=400, detail="Invalid fence type selected")
     
-    base_productivity_2_men = UK_FENCE_PRODUCTIVITY[request.fence_type]
+    base_productivity_2_men = UK_FENCE_PRODUCTIVITY[fence_type]
     
-    gate_hours_total = request.gates * 2
+    gate_hours_total = gates * UK_GATE_HOURS_PER_GATE
     
-    fence_days_for_2_men = request.meters / base_productivity_2_men
-    gate_days_for_2_men = gate_hours_total / 8
-    setup_cleanup_days = 1
+    fence_days_for_2_men = meters / base_productivity_2_men
+    gate_days_for_2_men = gate_hours_total / UK_HOURS_PER_DAY
+    setup_cleanup_days = UK_SETUP_CLEANUP_DAYS
     
-    total_worker_days_needed = (fence_days_for_2_men + gate_days_for_2_men + setup_cleanup_days) * 2
+    return (fence_days_for_2_men + gate_days_for_2_men + setup_cleanup_days) * UK_PRODUCTIVITY_CREW_SIZE
+
+def calculate_uk_concrete_cost(fence_type: str, meters: float):
+    if fence_type in UK_CONCRETE_FENCE_TYPES:
+        return meters * UK_CONCRETE_COST_PER_METER
+    return 0.0
+
+def calculate_uk_pricing(request: UKCalculationRequest):
+    """Calculate UK-specific pricing"""
+    total_worker_days_needed = calculate_uk_worker_days(request.fence_type, request.meters, request.gates)
+    base_productivity_2_men = UK_FENCE_PRODUCTIVITY[request.fence_type]
     
     if request.is_time_sensitive and request.days_available:
         days_available = request.days_available
         required_labourers = math.ceil(total_worker_days_needed / days_available)
-        if required_labourers < 2:
-            required_labourers = 2
+        if required_labourers < UK_MIN_LABOURERS:
+            required_labourers = UK_MIN_LABOURERS
         if required_labourers % 2 != 0:
             required_labourers += 1
         num_labourers = required_labourers
         total_work_days = math.ceil(total_worker_days_needed / num_labourers)
     else:
-        num_labourers = request.num_labourers if request.num_labourers and request.num_labourers >= 2 else 2
+        num_labourers = request.num_labourers if request.num_labourers and request.num_labourers >= UK_MIN_LABOURERS else UK_MIN_LABOURERS
         if num_labourers % 2 != 0:
             num_labourers += 1
         total_work_days = math.ceil(total_worker_days_needed / num_labourers)
     
     labor_cost = num_labourers * UK_DAILY_RATE_PER_MAN * total_work_days
     
-    tools_base = 200
-    tools_daily = 100 * total_work_days
+    tools_base = UK_TOOLS_BASE_COST
+    tools_daily = UK_TOOLS_COST_PER_DAY * total_work_days
     total_tools_cost = tools_base + tools_daily
     
     accommodation_cost = num_labourers * UK_ACCOMMODATION_PER_DAY_PER_MAN * total_work_days
     
     transportation_cost = UK_TRANSPORTATION_COST
     
-    if request.fence_type in ["PR", "CM", "CT", "HM"]:
-        concrete_cost = request.meters * UK_CONCRETE_COST_PER_METER
-    else:
-        concrete_cost = 0.0
+    concrete_cost = calculate_uk_concrete_cost(request.fence_type, request.meters)
     
     raw_total = labor_cost + total_tools_cost + accommodation_cost + transportation_cost + concrete_cost
     rate_per_meter = raw_total / request.meters if request.meters > 0 else 0
     
+    risk = None
+    if request.risk:
+        validate_risk_settings(request.risk)
+        work_days = sample_work_days(
+            meters=request.meters,
+            gates=request.gates,
+            daily_capacity=base_productivity_2_men,
+            crew_multiplier=2,
+            crew_size=num_labourers,
+            productivity_factor=request.risk.productivity_factor,
+            gate_hours=request.risk.gate_hours,
+            weather_day_rate=request.risk.weather_day_rate,
+            samples=request.risk.samples,
+            seed=request.risk.seed,
+        )
+        risk = summarize_risk(
+            work_days,
+            fixed_cost=tools_base + transportation_cost + concrete_cost,
+            cost_per_day=num_labourers * (UK_DAILY_RATE_PER_MAN + UK_ACCOMMODATION_PER_DAY_PER_MAN) + UK_TOOLS_COST_PER_DAY,
+            seed=request.risk.seed,
+        )
+    
     breakdown = UKCostBreakdown(
         work_days=float(total_work_days),
         num_labourers=num_labourers,
@@ -397,13 +578,8 @@ def calculate_uk_pricing(request: UKCalculationRequest):
         concrete_cost=round(concrete_cost, 2),
         raw_total=round(raw_total, 2),
         rate_per_meter=round(rate_per_meter, 2),
-        markup_30=round(raw_total * 1.30, 2),
-        markup_40=round(raw_total * 1.40, 2),
-        markup_50=round(raw_total * 1.50, 2),
-        markup_60=round(raw_total * 1.60, 2),
-        bad_case_20=round(raw_total * 1.20, 2),
-        more_bad_case_40=round(raw_total * 1.40, 2),
-        worst_case_80=round(raw_total * 1.80, 2)
+        **calculate_price_multiples(raw_total),
+        risk=risk
     )
     
     calculation = UKCalculation(
@@ -422,6 +598,70 @@ def calculate_uk_pricing(request: UKCalculationRequest):
     
     return calculation
 
+# Bump whenever a formula in calculate_pricing or calculate_uk_pricing changes,
+# and keep frontend/src/lib/pricing.js in step
+PRICING_MODEL_VERSION = "1"
+
+PRICING_MODEL = {
+    "version": PRICING_MODEL_VERSION,
+    "price_multipliers": PRICE_MULTIPLIERS,
+    "standard": {
+        "country_min_wages": COUNTRY_MIN_WAGES,
+        "fallback_min_wage": FALLBACK_MIN_WAGE,
+        "fence_daily_capacity": FENCE_DAILY_CAPACITY,
+        "gate_days_per_gate": GATE_DAYS_PER_GATE,
+        "setup_cleanup_days": SETUP_CLEANUP_DAYS,
+        "labor_rate_multiplier": LABOR_RATE_MULTIPLIER,
+        "hours_per_day": HOURS_PER_DAY,
+        "crew_size": CREW_SIZE,
+        "tools_base_cost": TOOLS_BASE_COST,
+        "tools_cost_per_day": TOOLS_COST_PER_DAY,
+        "supervision_cost_per_day": SUPERVISION_COST_PER_DAY,
+        "flight_ticket_cost": FLIGHT_TICKET_COST,
+        "default_ground_fixing_method": DEFAULT_GROUND_FIXING_METHOD,
+        "ground_fixing_cost_per_meter": GROUND_FIXING_COST_PER_METER,
+    },
+    "uk": {
+        "fence_productivity": UK_FENCE_PRODUCTIVITY,
+        "productivity_crew_size": UK_PRODUCTIVITY_CREW_SIZE,
+        "gate_hours_per_gate": UK_GATE_HOURS_PER_GATE,
+        "hours_per_day": UK_HOURS_PER_DAY,
+        "setup_cleanup_days": UK_SETUP_CLEANUP_DAYS,
+        "min_labourers": UK_MIN_LABOURERS,
+        "daily_rate_per_man": UK_DAILY_RATE_PER_MAN,
+        "accommodation_per_day_per_man": UK_ACCOMMODATION_PER_DAY_PER_MAN,
+        "transportation_cost": UK_TRANSPORTATION_COST,
+        "tools_base_cost": UK_TOOLS_BASE_COST,
+        "tools_cost_per_day": UK_TOOLS_COST_PER_DAY,
+        "concrete_cost_per_meter": UK_CONCRETE_COST_PER_METER,
+        "concrete_fence_types": UK_CONCRETE_FENCE_TYPES,
+    },
+}
+PRICING_MODEL_BODY = json.dumps(PRICING_MODEL, sort_keys=True).encode()
+PRICING_MODEL_ETAG = f'"{hashlib.sha256(PRICING_MODEL_BODY).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in if_none_match.split(",")
+    )
+
+@api_router.get("/pricing-model")
+async def get_pricing_model(request: Request):
+    """Rate tables and constants for computing previews client-side"""
+    headers = {
+        "ETag": PRICING_MODEL_ETAG,
+        "Cache-Control": "public, max-age=86400, stale-while-revalidate=604800",
+    }
+    if etag_matches(request.headers.get("If-None-Match"), PRICING_MODEL_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(PRICING_MODEL_BODY, media_type="application/json", headers=headers)
+
 @uk_router.get("/")
 async def uk_root():
     return {"message": "UK Racing Fence Installation Pricing API"}
@@ -433,17 +673,41 @@ async def get_uk_fence_types():
 @uk_router.post("/calculate-preview", response_model=UKCalculationResponse)
 async def uk_calculate_preview(request: UKCalculationRequest):
     """Calculate UK pricing without saving to database"""
-    calculation = calculate_uk_pricing(request)
+    if request.risk:
+        calculation = await run_in_threadpool(calculate_uk_pricing, request)
+    else:
+        calculation = calculate_uk_pricing(request)
     return {"calculation": calculation}
 
+def reprice_uk_calculation(calculation: UKCalculation) -> UKCalculation:
+    """Rebuild a posted UK calculation from its inputs with the current rates, as reprice_calculation"""
+    repriced = calculate_uk_pricing(UKCalculationRequest(
+        user_name=calculation.user_name,
+        project_name=calculation.project_name,
+        fence_type=calculation.fence_type,
+        meters=calculation.meters,
+        gates=calculation.gates,
+        is_time_sensitive=calculation.is_time_sensitive,
+        days_available=calculation.days_available,
+        num_labourers=calculation.num_labourers,
+        delivery_lead=calculation.delivery_lead,
+        delivery_copilot=calculation.delivery_copilot,
+    ))
+    if repriced.breakdown != calculation.breakdown.model_copy(update={"risk": None}):
+        logger.warning("Repriced UK calculation %s: posted breakdown does not match current rates", calculation.id)
+    return repriced.model_copy(update={"id": calculation.id, "timestamp": calculation.timestamp})
+
 @uk_router.post("/archive", response_model=UKCalculationResponse)
 async def uk_archive_calculation(calculation: UKCalculation):
     """Save UK calculation to archive"""
+    calculation = reprice_uk_calculation(calculation)
     doc = calculation.model_dump()
     doc['timestamp'] = doc['timestamp'].isoformat()
+    doc['archived_at'] = datetime.now(timezone.utc).isoformat()
     doc['calculator_type'] = 'uk'
     
     await db.uk_calculations.insert_one(doc)
+    uk_calculations_list_cache.invalidate()
     
     return {"calculation": calculation}
 
@@ -454,28 +718,200 @@ async def uk_delete_calculations(request: DeleteRequest):
         result = await db.uk_calculations.delete_many({"id": {"$in": request.ids}})
         return {"deleted_count": result.deleted_count, "ids": request.ids}
     except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error deleting UK calculations: {e}")
+        logger.error("Error deleting UK calculations: %s", e)
         raise HTTPException(status_code=500, detail="Failed to delete calculations")
+    finally:
+        uk_calculations_list_cache.invalidate()
+
+def parse_uk_calculation(calc: dict) -> UKCalculation:
+    if isinstance(calc['timestamp'], str):
+        calc['timestamp'] = datetime.fromisoformat(calc['timestamp'])
+    
+    return UKCalculation(**calc)
 
 @uk_router.get("/calculations")
 async def get_uk_calculations():
+    body = await uk_calculations_list_cache.get("latest", load_uk_calculations_list)
+    return Response(body, media_type="application/json")
+
+async def load_uk_calculations_list():
     calculations = await db.uk_calculations.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
     
     result = []
     for calc in calculations:
         try:
-            if isinstance(calc['timestamp'], str):
-                calc['timestamp'] = datetime.fromisoformat(calc['timestamp'])
-            
-            validated_calc = UKCalculation(**calc)
-            result.append(validated_calc.model_dump())
+            result.append(parse_uk_calculation(calc).model_dump())
         except Exception as e:
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Skipping invalid UK calculation: {e}")
+            logger.warning("Skipping invalid UK calculation %s: %s", calc.get('id'), e)
             continue
     
-    return result
+    return serialize_list(result)
+
+class DocumentBatchRequest(BaseModel):
+    ids: List[str]
+
+async def load_calculations(collection, ids: List[str], parse):
+    docs = await collection.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
+    found = {doc['id']: doc for doc in docs}
+    missing = [calc_id for calc_id in ids if calc_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Calculations not found: {', '.join(missing)}")
+    return [parse(found[calc_id]).model_dump() for calc_id in ids]
+
+async def calculation_document(collection, calculation_id: str, parse):
+    calculations = await load_calculations(collection, [calculation_id], parse)
+    content = await document_cache.render(calculations[0])
+    return Response(
+        content,
+        media_type="text/html",
+        headers={"Content-Disposition": f'attachment; filename="quote-{calculation_id}.html"'},
+    )
+
+async def calculation_documents_zip(collection, ids: List[str], parse):
+    if not ids:
+        raise HTTPException(status_code=400, detail="No calculations selected")
+    calculations = await load_calculations(collection, list(dict.fromkeys(ids)), parse)
+    documents = await document_cache.render_many(calculations)
+    files = [(f"quote-{calc['id']}.html", content) for calc, content in zip(calculations, documents)]
+    content = await run_in_threadpool(build_zip, files)
+    return Response(
+        content,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="quotes.zip"'},
+    )
+
+@api_router.get("/calculations/{calculation_id}/document")
+async def get_calculation_document(calculation_id: str):
+    """Quote document for an archived calculation"""
+    return await calculation_document(db.calculations, calculation_id, parse_calculation)
+
+@api_router.post("/calculations/documents")
+async def get_calculation_documents(request: DocumentBatchRequest):
+    """Zip of quote documents for a tender's calculations"""
+    return await calculation_documents_zip(db.calculations, request.ids, parse_calculation)
+
+@uk_router.get("/calculations/{calculation_id}/document")
+async def get_uk_calculation_document(calculation_id: str):
+    """Quote document for an archived UK calculation"""
+    return await calculation_document(db.uk_calculations, calculation_id, parse_uk_calculation)
+
+@uk_router.post("/calculations/documents")
+async def get_uk_calculation_documents(request: DocumentBatchRequest):
+    """Zip of quote documents for a tender's UK calculations"""
+    return await calculation_documents_zip(db.uk_calculations, request.ids, parse_uk_calculation)
+
+SNAPSHOT_DIR = Path(os.environ.get('SNAPSHOT_DIR', ROOT_DIR / 'snapshots'))
+snapshot_lock = asyncio.Lock()
+
+@api_router.post("/snapshots")
+async def create_snapshot(compress: bool = True):
+    """Append archive documents newer than the last snapshot to SNAPSHOT_DIR"""
+    async with snapshot_lock:
+        written = await snapshot_archive(db, SNAPSHOT_DIR, compress=compress)
+    logger.info("Snapshot written to %s: %s", SNAPSHOT_DIR, written)
+    return {"directory": str(SNAPSHOT_DIR), "written": written}
+
+class UKScheduleJob(UKCalculationRequest):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    earliest_start: date
+    deadline: Optional[date] = None
+
+class UKScheduleRequest(BaseModel):
+    jobs: List[UKScheduleJob]
+    crew_headcount: int = Field(ge=2)
+    leads: List[str] = Field(default_factory=list)
+    objective: Literal["makespan", "cost"] = "makespan"
+    time_limit: float = Field(default=2.0, gt=0, le=30)
+    seed: int = 42
+
+class UKScheduledJob(BaseModel):
+    id: str
+    project_name: str
+    fence_type: str
+    start_date: date
+    end_date: date
+    work_days: int
+    num_labourers: int
+    delivery_lead: Optional[str] = None
+    delivery_copilot: Optional[str] = None
+    cost: float
+    late_days: int
+
+class UKScheduleResponse(BaseModel):
+    objective: str
+    season_start: date
+    season_end: date
+    makespan_days: int
+    total_cost: float
+    total_late_days: int
+    jobs: List[UKScheduledJob]
+
+@uk_router.post("/schedule", response_model=UKScheduleResponse)
+def uk_schedule(request: UKScheduleRequest):
+    """Allocate crews and delivery leads across a season of UK jobs"""
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="No jobs to schedule")
+    if len({job.id for job in request.jobs}) != len(request.jobs):
+        raise HTTPException(status_code=400, detail="Job ids must be unique")
+    
+    season_start = min(job.earliest_start for job in request.jobs)
+    
+    schedule_input = []
+    for job in request.jobs:
+        if job.deadline and job.deadline < job.earliest_start:
+            raise HTTPException(status_code=400, detail=f"Deadline before earliest start for {job.project_name}")
+        schedule_input.append(ScheduleJob(
+            id=job.id,
+            worker_days=calculate_uk_worker_days(job.fence_type, job.meters, job.gates),
+            release_day=(job.earliest_start - season_start).days,
+            due_day=(job.deadline - season_start).days if job.deadline else None,
+            fixed_cost=UK_TOOLS_BASE_COST + UK_TRANSPORTATION_COST + calculate_uk_concrete_cost(job.fence_type, job.meters),
+            cost_per_man_day=UK_DAILY_RATE_PER_MAN + UK_ACCOMMODATION_PER_DAY_PER_MAN,
+            cost_per_day=UK_TOOLS_COST_PER_DAY,
+            max_days=job.days_available if job.is_time_sensitive else None,
+            lead=job.delivery_lead,
+            copilot=job.delivery_copilot,
+        ))
+    
+    try:
+        placements, _ = schedule_jobs(
+            schedule_input,
+            crew_headcount=request.crew_headcount,
+            leads=request.leads,
+            objective=request.objective,
+            time_limit=request.time_limit,
+            seed=request.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    scheduled = []
+    for job, placement in zip(request.jobs, placements):
+        start_date = season_start + timedelta(days=placement.start_day)
+        scheduled.append(UKScheduledJob(
+            id=job.id,
+            project_name=job.project_name,
+            fence_type=job.fence_type,
+            start_date=start_date,
+            end_date=start_date + timedelta(days=placement.work_days - 1),
+            work_days=placement.work_days,
+            num_labourers=placement.num_labourers,
+            delivery_lead=placement.lead,
+            delivery_copilot=placement.copilot,
+            cost=round(placement.cost, 2),
+            late_days=placement.late_days,
+        ))
+    
+    season_end = max(job.end_date for job in scheduled)
+    return UKScheduleResponse(
+        objective=request.objective,
+        season_start=season_start,
+        season_end=season_end,
+        makespan_days=(season_end - season_start).days + 1,
+        total_cost=round(sum(job.cost for job in scheduled), 2),
+        total_late_days=sum(job.late_days for job in scheduled),
+        jobs=scheduled,
+    )
 
 app.include_router(api_router)
 app.include_router(uk_router)
@@ -488,16 +924,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag logs for this request with a correlation id and echo it back"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    # Not reset afterwards: each request runs in its own task, and uvicorn's
+    # access log line is written after this returns but should carry the id
+    request_id_var.set(request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
 
+@app.on_event("shutdown")
+async def shutdown_log_listener():
+    shutdown_logging()
+
 FRONTEND_BUILD_DIR = ROOT_DIR.parent / "frontend" / "build"
 
 if FRONTEND_BUILD_DIR.exists():
@@ -0,0 +1,335 @@
+"""Columnar snapshots of the calculation archive for offline analytics.
+
+Each collection is written to its own directory as a series of NumPy
+segments plus a ``manifest.json``. A snapshot run only exports documents
+whose server-set ``archived_at`` is past the manifest's watermark and appends
+them as a new segment. Documents archived in the last few seconds are left
+for the next run, so an insert that is still in flight cannot end up behind
+the watermark. Nested fields such as ``breakdown`` are flattened into dotted
+column names (``breakdown.labor_cost``), with masks recording which rows had
+a null or no value at all, so restored documents keep their original shape.
+
+Segments are ``.npz`` files by default. With ``compress=False`` a segment is
+a directory of ``.npy`` files that can be memory mapped on load. Deletions
+in Mongo are not carried into existing segments; take a fresh snapshot into
+an empty directory to drop them.
+
+Run ``python snapshot.py --help`` from the backend directory for the CLI.
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_COLLECTIONS = ("calculations", "uk_calculations")
+MANIFEST_NAME = "manifest.json"
+NULL_PREFIX = "__null__."
+MISSING_PREFIX = "__missing__."
+DATETIME_COLUMNS = ("timestamp", "archived_at")
+SETTLE_SECONDS = 5
+
+
+def flatten_document(doc: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(flatten_document(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def unflatten_row(row: dict) -> dict:
+    """Rebuild a nested document from the dotted columns present in a row."""
+    doc = {}
+    for name, value in row.items():
+        target = doc
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return doc
+
+
+def _column_kind(name, values):
+    present = [value for value in values if value is not None]
+    if name in DATETIME_COLUMNS:
+        return "datetime"
+    if not present:
+        return "str"
+    if all(isinstance(value, bool) for value in present):
+        return "bool"
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return "int"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return "float"
+    if all(isinstance(value, str) for value in present):
+        return "str"
+    return "json"
+
+
+def _to_datetime64(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+def _encode_column(kind, values):
+    if kind == "datetime":
+        return np.array(
+            [_to_datetime64(value) if value is not None else np.datetime64("NaT") for value in values],
+            dtype="datetime64[us]",
+        )
+    if kind == "bool":
+        return np.array([bool(value) for value in values], dtype=bool)
+    if kind == "int":
+        return np.array([value if value is not None else 0 for value in values], dtype=np.int64)
+    if kind == "float":
+        return np.array([value if value is not None else np.nan for value in values], dtype=np.float64)
+    if kind == "json":
+        values = [json.dumps(value, default=str) if value is not None else "" for value in values]
+    return np.array([value if value is not None else "" for value in values], dtype=str)
+
+
+def _decode_value(kind, value):
+    if kind == "datetime":
+        return pd.Timestamp(value).tz_localize(timezone.utc).isoformat()
+    if kind == "json":
+        return json.loads(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def columns_from_documents(docs):
+    """Turn documents into (arrays, kinds).
+
+    A column some documents lack gets a missing mask, and one with null values
+    gets a null mask, so restore can tell an absent field from an explicit null.
+    """
+    rows = [flatten_document(doc) for doc in docs]
+    names = sorted({name for row in rows for name in row})
+
+    arrays = {}
+    kinds = {}
+    for name in names:
+        missing = [name not in row for row in rows]
+        values = [row.get(name) for row in rows]
+        kind = _column_kind(name, values)
+        kinds[name] = kind
+        arrays[name] = _encode_column(kind, values)
+        if any(missing):
+            arrays[MISSING_PREFIX + name] = np.array(missing, dtype=bool)
+        nulls = [value is None and not absent for value, absent in zip(values, missing)]
+        if any(nulls):
+            arrays[NULL_PREFIX + name] = np.array(nulls, dtype=bool)
+    return arrays, kinds
+
+
+def _read_manifest(directory: Path):
+    path = directory / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"watermark": None, "segments": []}
+
+
+def _write_manifest(directory: Path, manifest):
+    tmp_path = directory / f"{MANIFEST_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    tmp_path.replace(directory / MANIFEST_NAME)
+
+
+def _write_segment(directory: Path, name: str, arrays, compress: bool):
+    if compress:
+        np.savez_compressed(directory / f"{name}.npz", **arrays)
+        return f"{name}.npz"
+    segment_dir = directory / name
+    segment_dir.mkdir()
+    for column, array in arrays.items():
+        np.save(segment_dir / f"{column}.npy", array)
+    return name
+
+
+def _read_segment(directory: Path, segment, mmap_mode=None):
+    path = directory / segment["file"]
+    if path.suffix == ".npz":
+        with np.load(path) as data:
+            return {column: data[column] for column in data.files}
+    return {
+        column_path.stem: np.load(column_path, mmap_mode=mmap_mode)
+        for column_path in sorted(path.glob("*.npy"))
+    }
+
+
+async def snapshot_collection(collection, directory: Path, compress: bool = True, batch_size: int = 50_000):
+    """Append documents newer than the watermark to a collection snapshot.
+
+    Returns the number of documents written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(directory)
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=SETTLE_SECONDS)).isoformat()
+    if manifest["watermark"]:
+        query = {"archived_at": {"$gt": manifest["watermark"], "$lte": cutoff}}
+    else:
+        # Also matches documents archived before archived_at was recorded
+        query = {"archived_at": {"$not": {"$gt": cutoff}}}
+    cursor = collection.find(query, {"_id": 0}).sort([("archived_at", 1), ("timestamp", 1)])
+
+    written = 0
+    while True:
+        docs = await cursor.to_list(batch_size)
+        if not docs:
+            break
+
+        await asyncio.to_thread(_append_segment, directory, manifest, docs, compress)
+        written += len(docs)
+
+    if written:
+        # Everything archived up to the cutoff has now been exported, including
+        # older documents that have no archived_at
+        manifest["watermark"] = cutoff
+        _write_manifest(directory, manifest)
+    return written
+
+
+def _append_segment(directory: Path, manifest, docs, compress: bool):
+    arrays, kinds = columns_from_documents(docs)
+    watermark = docs[-1].get("archived_at") or manifest["watermark"]
+
+    # Unique, so a segment left behind by a crashed run or written by a
+    # concurrent one never blocks this write; readers only see manifest entries
+    name = f"segment-{len(manifest['segments']) + 1:05d}-{uuid.uuid4().hex[:12]}"
+    file_name = _write_segment(directory, name, arrays, compress)
+    manifest["segments"].append({
+        "file": file_name,
+        "rows": len(docs),
+        "columns": kinds,
+        "watermark": watermark,
+        "created": datetime.now(timezone.utc).isoformat(),
+    })
+    manifest["watermark"] = watermark
+    _write_manifest(directory, manifest)
+
+
+async def snapshot_archive(db, directory: Path, compress: bool = True):
+    """Snapshot every archive collection into ``directory/<collection>``."""
+    return {
+        name: await snapshot_collection(db[name], Path(directory) / name, compress=compress)
+        for name in SNAPSHOT_COLLECTIONS
+    }
+
+
+def _absent_mask(arrays, name):
+    masks = [arrays[prefix + name] for prefix in (NULL_PREFIX, MISSING_PREFIX) if prefix + name in arrays]
+    if not masks:
+        return None
+    return np.logical_or.reduce(masks)
+
+
+def load_snapshot(directory: Path, mmap_mode=None) -> pd.DataFrame:
+    """Load a collection snapshot as one DataFrame.
+
+    ``mmap_mode`` is passed to ``np.load`` for uncompressed segments so their
+    columns are memory mapped rather than read into memory.
+    """
+    directory = Path(directory)
+    frames = []
+    for segment in _read_manifest(directory)["segments"]:
+        arrays = _read_segment(directory, segment, mmap_mode)
+        columns = {}
+        for name, kind in segment["columns"].items():
+            mask = _absent_mask(arrays, name)
+            column = arrays[name]
+            if mask is not None and mask.any():
+                column = pd.Series(column).astype(object).mask(mask, None)
+                if kind == "float":
+                    column = column.astype("float64")
+            columns[name] = column
+        frames.append(pd.DataFrame(columns, copy=False))
+
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_snapshot_documents(directory: Path):
+    """Yield archive documents from a collection snapshot, oldest first."""
+    directory = Path(directory)
+    for segment in _read_manifest(directory)["segments"]:
+        arrays = _read_segment(directory, segment, mmap_mode="r")
+        kinds = segment["columns"]
+        for index in range(segment["rows"]):
+            row = {}
+            for name, kind in kinds.items():
+                missing = arrays.get(MISSING_PREFIX + name)
+                if missing is not None and missing[index]:
+                    continue
+                nulls = arrays.get(NULL_PREFIX + name)
+                if nulls is not None and nulls[index]:
+                    row[name] = None
+                else:
+                    row[name] = _decode_value(kind, arrays[name][index])
+            yield unflatten_row(row)
+
+
+async def restore_collection(collection, directory: Path, batch_size: int = 5_000):
+    """Bulk insert a collection snapshot. Returns the number of documents inserted."""
+    restored = 0
+    batch = []
+    for doc in iter_snapshot_documents(directory):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await collection.insert_many(batch, ordered=False)
+            restored += len(batch)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+        restored += len(batch)
+    return restored
+
+
+async def restore_archive(db, directory: Path):
+    """Bulk load every collection snapshot in ``directory`` into an empty database."""
+    for name in SNAPSHOT_COLLECTIONS:
+        if await db[name].estimated_document_count():
+            raise ValueError(f"Collection {name} is not empty")
+
+    counts = {}
+    for name in SNAPSHOT_COLLECTIONS:
+        if (Path(directory) / name / MANIFEST_NAME).exists():
+            counts[name] = await restore_collection(db[name], Path(directory) / name)
+    return counts
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="Snapshot and restore the calculation archive.")
+
+    @cli.command()
+    def snapshot(directory: Path, compress: bool = True):
+        """Append new archive documents to the snapshot in DIRECTORY."""
+        from server import db
+        typer.echo(json.dumps(asyncio.run(snapshot_archive(db, directory, compress=compress))))
+
+    @cli.command()
+    def restore(directory: Path):
+        """Bulk load the snapshot in DIRECTORY into the configured database."""
+        from server import db
+        try:
+            counts = asyncio.run(restore_archive(db, directory))
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+        typer.echo(json.dumps(counts))
+
+    cli()
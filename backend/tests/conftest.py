@@ -0,0 +1,108 @@
+import asyncio
+import copy
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("DOCUMENT_CACHE_DIR", tempfile.mkdtemp(prefix="document_cache_"))
+
+
+def _matches(value, condition):
+    if not isinstance(condition, dict):
+        return value == condition
+    for op, operand in condition.items():
+        if op == "$in" and value not in operand:
+            return False
+        if op == "$not" and _matches(value, operand):
+            return False
+        # Comparisons never match missing fields, as in Mongo
+        if op in ("$gt", "$lte") and value is None:
+            return False
+        if op == "$gt" and not value > operand:
+            return False
+        if op == "$lte" and not value <= operand:
+            return False
+    return True
+
+
+class MemoryCursor:
+    def __init__(self, collection, docs):
+        self.collection = collection
+        self.docs = docs
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        # Stable sorts from the last key to the first give a multi-key sort;
+        # missing fields sort first, as in Mongo
+        for name, order in reversed(keys):
+            self.docs.sort(key=lambda doc: (name in doc, doc.get(name) or ""), reverse=order < 0)
+        return self
+
+    async def to_list(self, length):
+        if self.collection.latency:
+            await asyncio.sleep(self.collection.latency)
+        batch, self.docs = self.docs[:length], self.docs[length:]
+        return batch
+
+
+class MemoryCollection:
+    """In-memory stand-in for the parts of a Motor collection the backend uses.
+
+    Queries support equality, ``$in``, ``$gt``, ``$lte`` and ``$not`` on top
+    level fields. ``latency`` delays each batch read, and ``queries`` counts
+    ``find`` calls.
+    """
+
+    def __init__(self, docs=(), latency=0.0):
+        self.docs = [copy.deepcopy(doc) for doc in docs]
+        self.latency = latency
+        self.queries = 0
+
+    def find(self, query=None, projection=None):
+        self.queries += 1
+        query = query or {}
+        docs = [
+            copy.deepcopy(doc) for doc in self.docs
+            if all(_matches(doc.get(field), condition) for field, condition in query.items())
+        ]
+        return MemoryCursor(self, docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(copy.deepcopy(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(copy.deepcopy(doc) for doc in docs)
+
+    async def delete_many(self, query):
+        kept = [doc for doc in self.docs if not all(_matches(doc.get(f), c) for f, c in query.items())]
+        deleted_count, self.docs = len(self.docs) - len(kept), kept
+        return SimpleNamespace(deleted_count=deleted_count)
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+
+class MemoryDatabase:
+    def __init__(self, **collections):
+        self.calculations = MemoryCollection(collections.get("calculations", ()))
+        self.uk_calculations = MemoryCollection(collections.get("uk_calculations", ()))
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def memory_db(monkeypatch):
+    """Replace server.db with empty in-memory collections."""
+    import server
+
+    database = MemoryDatabase()
+    monkeypatch.setattr(server, "db", database)
+    return database
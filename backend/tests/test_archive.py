@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+STANDARD_REQUEST = dict(user_name="Archive", project_name="Track", country="Germany", fence_type="OR", meters=800.0, gates=3)
+UK_REQUEST = dict(
+    user_name="Archive", project_name="Yard", fence_type="PR", meters=300.0, gates=2,
+    is_time_sensitive=True, days_available=5, delivery_copilot="Sam",
+)
+
+
+@pytest.fixture
+def client(memory_db):
+    return TestClient(server.app), memory_db
+
+
+def test_archive_keeps_matching_breakdown(client):
+    client, db = client
+    calculation = server.calculate_pricing(server.CalculationRequest(**STANDARD_REQUEST)).model_dump(mode="json")
+
+    response = client.post("/api/archive", json=calculation)
+    assert response.status_code == 200
+    archived = response.json()["calculation"]
+    assert archived["id"] == calculation["id"]
+    assert archived["breakdown"] == calculation["breakdown"]
+    assert db.calculations.docs[0]["breakdown"] == calculation["breakdown"]
+
+
+def test_archive_reprices_tampered_breakdown(client):
+    client, db = client
+    expected = server.calculate_pricing(server.CalculationRequest(**STANDARD_REQUEST)).model_dump(mode="json")
+    posted = dict(expected, breakdown=dict(expected["breakdown"], raw_total=1.0, markup_30=1.3, labor_cost=0.0))
+
+    archived = client.post("/api/archive", json=posted).json()["calculation"]
+    assert archived["breakdown"] == expected["breakdown"]
+    assert db.calculations.docs[0]["breakdown"]["raw_total"] == expected["breakdown"]["raw_total"]
+
+
+def test_archive_reprices_stale_rates(client, monkeypatch):
+    client, _ = client
+    stale = server.calculate_pricing(server.CalculationRequest(**STANDARD_REQUEST)).model_dump(mode="json")
+
+    # Rates change after the client cached the pricing model
+    monkeypatch.setitem(server.COUNTRY_MIN_WAGES, "Germany", 14.0)
+    current = server.calculate_pricing(server.CalculationRequest(**STANDARD_REQUEST)).model_dump(mode="json")
+    assert current["breakdown"] != stale["breakdown"]
+
+    archived = client.post("/api/archive", json=stale).json()["calculation"]
+    assert archived["breakdown"] == current["breakdown"]
+
+
+def test_uk_archive_reprices_from_inputs(client):
+    client, db = client
+    expected = server.calculate_uk_pricing(server.UKCalculationRequest(**UK_REQUEST)).model_dump(mode="json")
+    posted = dict(expected, breakdown=dict(expected["breakdown"], labor_cost=0.0, raw_total=0.0))
+
+    archived = client.post("/api/uk/archive", json=posted).json()["calculation"]
+    assert archived["breakdown"] == expected["breakdown"]
+    assert archived["num_labourers"] == expected["num_labourers"]
+    assert db.uk_calculations.docs[0]["calculator_type"] == "uk"
+
+
+def test_archive_rejects_invalid_inputs(client):
+    client, db = client
+    calculation = server.calculate_pricing(server.CalculationRequest(**STANDARD_REQUEST)).model_dump(mode="json")
+    response = client.post("/api/archive", json=dict(calculation, country="Atlantis"))
+    assert response.status_code == 400
+    assert db.calculations.docs == []
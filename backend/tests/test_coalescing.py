@@ -0,0 +1,66 @@
+import asyncio
+
+from coalescing import SingleFlightCache
+
+
+class CountingLoader:
+    def __init__(self, delay=0.01):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return call
+
+
+def test_concurrent_reads_share_one_load():
+    async def scenario():
+        cache = SingleFlightCache(ttl=60)
+        load = CountingLoader()
+        results = await asyncio.gather(*(cache.get("key", load) for _ in range(200)))
+        return load.calls, set(results)
+
+    assert asyncio.run(scenario()) == (1, {1})
+
+
+def test_cached_value_expires_after_ttl():
+    async def scenario():
+        cache = SingleFlightCache(ttl=0.01)
+        load = CountingLoader(delay=0)
+        await cache.get("key", load)
+        await cache.get("key", load)
+        await asyncio.sleep(0.02)
+        await cache.get("key", load)
+        return load.calls
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_reads_after_invalidate_do_not_join_older_load():
+    async def scenario():
+        cache = SingleFlightCache(ttl=60)
+        load = CountingLoader(delay=0.05)
+        before_write = asyncio.ensure_future(cache.get("key", load))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        after_write = await cache.get("key", load)
+        cached = await cache.get("key", load)
+        return await before_write, after_write, cached, load.calls
+
+    # The load started before the write is not cached; the newer one is
+    assert asyncio.run(scenario()) == (1, 2, 2, 2)
+
+
+def test_cancelled_caller_does_not_cancel_shared_load():
+    async def scenario():
+        cache = SingleFlightCache(ttl=60)
+        load = CountingLoader(delay=0.02)
+        leader = asyncio.ensure_future(cache.get("key", load))
+        follower = asyncio.ensure_future(cache.get("key", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, load.calls
+
+    assert asyncio.run(scenario()) == (1, 1)
@@ -0,0 +1,165 @@
+import asyncio
+import io
+import os
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import documents
+import server
+from documents import DocumentCache, build_zip, render_quote_html
+
+
+def standard_calculation(**overrides):
+    request = dict(user_name="Quotes", project_name="Depot", country="Germany", fence_type="OR", meters=1234567.5, gates=3)
+    request.update(overrides)
+    calculation = server.calculate_pricing(server.CalculationRequest(**request))
+    return calculation.model_dump(mode="json")
+
+
+def uk_calculation():
+    request = server.UKCalculationRequest(
+        user_name="Quotes", project_name="Yard", fence_type="OR", meters=400, gates=1, delivery_copilot="Sam"
+    )
+    return server.calculate_uk_pricing(request).model_dump(mode="json")
+
+
+class CountingRender:
+    def __init__(self, monkeypatch):
+        self.calls = 0
+        monkeypatch.setattr(documents, "render_quote_html", self)
+
+    def __call__(self, calculation):
+        self.calls += 1
+        return render_quote_html(calculation)
+
+
+def test_render_formats_values():
+    page = render_quote_html(standard_calculation(project_name="<Depot & Co>"))
+    assert "1,234,567.5" in page
+    assert "e+" not in page
+    assert "&lt;Depot &amp; Co&gt;" in page
+    assert "Germany" in page
+
+    page = render_quote_html(uk_calculation())
+    assert "Delivery co-pilot" in page
+    assert "Concrete" in page
+
+
+def test_number_format_drops_trailing_zeros():
+    assert documents._format_value(1234567.0, "number") == "1,234,567"
+    assert documents._format_value(2.5, "number") == "2.5"
+    assert documents._format_value(None, "number") == "-"
+
+
+def test_cache_hit_skips_rendering(tmp_path, monkeypatch):
+    render = CountingRender(monkeypatch)
+    cache = DocumentCache(tmp_path, max_bytes=1_000_000, workers=1)
+    calculation = standard_calculation()
+
+    first = cache.get_or_render(calculation)
+    second = cache.get_or_render(calculation)
+    assert first == second
+    assert render.calls == 1
+
+    # A changed calculation is a different document
+    cache.get_or_render(dict(calculation, project_name="Other"))
+    assert render.calls == 2
+
+    # Entries on disk are picked up by a new cache
+    render.calls = 0
+    assert DocumentCache(tmp_path, max_bytes=1_000_000).get_or_render(calculation) == first
+    assert render.calls == 0
+
+
+def test_eviction_keeps_cache_within_budget(tmp_path, monkeypatch):
+    render = CountingRender(monkeypatch)
+    calculations = [standard_calculation(project_name=f"Site {i}") for i in range(5)]
+    size = len(render_quote_html(calculations[0]).encode())
+    cache = DocumentCache(tmp_path, max_bytes=size * 2, workers=2)
+
+    contents = asyncio.run(cache.render_many(calculations))
+    assert all(content.startswith(b"<!DOCTYPE html>") for content in contents)
+    assert len(list(tmp_path.glob("*.html"))) <= 2
+
+    # The oldest document was evicted and is rendered again
+    render.calls = 0
+    assert cache.get_or_render(calculations[0]) == contents[0]
+    assert render.calls == 1
+
+
+def test_evicted_file_is_rendered_again(tmp_path):
+    cache = DocumentCache(tmp_path, max_bytes=1_000_000)
+    calculation = standard_calculation()
+    content = cache.get_or_render(calculation)
+    cache.path_for(documents.document_key(calculation)).unlink()
+    assert cache.get_or_render(calculation) == content
+
+
+def test_build_zip_bundles_contents():
+    archive = zipfile.ZipFile(io.BytesIO(build_zip([("a.html", b"one"), ("b.html", b"two")])))
+    assert archive.read("a.html") == b"one"
+    assert archive.read("b.html") == b"two"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, memory_db):
+    standard = [standard_calculation(project_name=f"Site {i}") for i in range(4)]
+    uk = [uk_calculation()]
+    memory_db.calculations.docs.extend(standard)
+    memory_db.uk_calculations.docs.extend(uk)
+    # Smaller than one document, so every batch is bigger than the cache
+    monkeypatch.setattr(server, "document_cache", DocumentCache(tmp_path, max_bytes=1, workers=2))
+    return TestClient(server.app), standard, uk
+
+
+def test_document_endpoint(client):
+    client, standard, uk = client
+    response = client.get(f"/api/calculations/{standard[0]['id']}/document")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert f"quote-{standard[0]['id']}.html" in response.headers["content-disposition"]
+    assert "Site 0" in response.text
+
+    response = client.get(f"/api/uk/calculations/{uk[0]['id']}/document")
+    assert response.status_code == 200
+    assert "Yard" in response.text
+
+    assert client.get("/api/calculations/missing/document").status_code == 404
+
+
+def test_batch_endpoint_larger_than_cache(client):
+    client, standard, _ = client
+    ids = [calc["id"] for calc in standard]
+    response = client.post("/api/calculations/documents", json={"ids": ids + ids[:1]})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == [f"quote-{calc_id}.html" for calc_id in ids]
+    assert b"Site 3" in archive.read(f"quote-{ids[3]}.html")
+
+    assert client.post("/api/calculations/documents", json={"ids": []}).status_code == 400
+    assert client.post("/api/uk/calculations/documents", json={"ids": ["missing"]}).status_code == 404
+
+
+def test_startup_cleans_up_and_applies_budget(tmp_path):
+    calculations = [standard_calculation(project_name=f"Site {i}") for i in range(3)]
+    cache = DocumentCache(tmp_path, max_bytes=1_000_000)
+    first, _, _ = (cache.get_or_render(calculation) for calculation in calculations)
+    (tmp_path / "interrupted.tmp").write_bytes(b"partial")
+
+    # Make the first document the oldest on disk, then use it again
+    old = tmp_path.stat().st_mtime - 3600
+    for index, calculation in enumerate(calculations):
+        path = cache.path_for(documents.document_key(calculation))
+        os.utime(path, (old + index, old + index))
+    assert cache.get_or_render(calculations[0]) == first
+
+    restarted = DocumentCache(tmp_path, max_bytes=len(first) * 2)
+    assert not list(tmp_path.glob("*.tmp"))
+    assert restarted._total_bytes <= len(first) * 2
+    # The second document is now the least recently used and was evicted
+    remaining = {path.stem for path in tmp_path.glob("*.html")}
+    assert remaining == {documents.document_key(calculations[i]) for i in (0, 2)}
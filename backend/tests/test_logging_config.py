@@ -0,0 +1,147 @@
+import io
+import json
+import logging
+import logging.config
+import queue
+
+import pytest
+import uvicorn.config
+from fastapi.testclient import TestClient
+
+import logging_config
+import server
+from logging_config import JsonFormatter, NonBlockingQueueHandler, RateLimitFilter, RequestIdFilter, request_id_var
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(logging_config.time, "monotonic", clock)
+    return clock
+
+
+def make_record(msg="Skipping invalid calculation %s", level=logging.WARNING, lineno=10, args=("x",)):
+    return logging.makeLogRecord({
+        "name": "server", "msg": msg, "args": args, "levelno": level,
+        "levelname": logging.getLevelName(level), "lineno": lineno,
+    })
+
+
+def test_rate_limit_allows_burst_then_samples(clock):
+    limiter = RateLimitFilter(burst=3, interval=60, sample_every=5)
+    passed = [record for record in (make_record() for _ in range(13)) if limiter.filter(record)]
+
+    # Three in the burst, then every fifth record carrying what was skipped
+    assert len(passed) == 5
+    assert [getattr(record, "suppressed", 0) for record in passed] == [0, 0, 0, 4, 4]
+
+
+def test_rate_limit_is_per_call_site_and_spares_errors(clock):
+    limiter = RateLimitFilter(burst=1, interval=60, sample_every=100)
+    assert limiter.filter(make_record())
+    assert not limiter.filter(make_record())
+    assert limiter.filter(make_record(lineno=20))
+    assert limiter.filter(make_record(level=logging.ERROR))
+
+
+def test_rate_limit_window_resets_with_suppressed_count(clock):
+    limiter = RateLimitFilter(burst=1, interval=60, sample_every=100)
+    for _ in range(4):
+        limiter.filter(make_record())
+
+    clock.now += 61
+    record = make_record()
+    assert limiter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_rate_limit_prunes_expired_windows(clock):
+    limiter = RateLimitFilter(burst=1, interval=60)
+    for lineno in range(1000):
+        limiter.filter(make_record(lineno=lineno))
+    assert len(limiter._windows) == 1000
+
+    clock.now += 121
+    limiter.filter(make_record(lineno=5000))
+    assert list(limiter._windows) == [("server", "Skipping invalid calculation %s", 5000)]
+
+
+def test_request_id_filter_stamps_records():
+    record = make_record()
+    token = request_id_var.set("abc123")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    assert record.request_id == "abc123"
+    assert '"request_id": "abc123"' in JsonFormatter().format(record)
+
+
+def test_full_queue_drops_and_reports():
+    log_queue = queue.Queue(maxsize=2)
+    handler = NonBlockingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(make_record(args=(i,)))
+    assert handler.dropped == 3
+    assert [log_queue.get_nowait().args for _ in range(2)] == [(0,), (1,)]
+
+    handler.handle(make_record(args=(5,)))
+    report, record = log_queue.get_nowait(), log_queue.get_nowait()
+    assert report.levelno == logging.WARNING
+    assert report.getMessage() == "Dropped 3 log records while the queue was full"
+    assert record.args == (5,)
+    assert handler.dropped == 3
+
+
+def test_middleware_echoes_or_assigns_request_id():
+    client = TestClient(server.app)
+    response = client.get("/api/", headers={"X-Request-ID": "from-client"})
+    assert response.headers["X-Request-ID"] == "from-client"
+
+    first = client.get("/api/").headers["X-Request-ID"]
+    second = client.get("/api/").headers["X-Request-ID"]
+    assert first and second and first != second
+
+
+@pytest.fixture
+def captured_logging():
+    stream = io.StringIO()
+    logging_config.shutdown_logging()
+    yield stream
+    logging_config.shutdown_logging()
+    logging_config.configure_logging()
+
+
+def test_uvicorn_loggers_go_through_the_queue(captured_logging):
+    # As left by uvicorn's own LOGGING_CONFIG before the app is imported
+    logging.config.dictConfig(uvicorn.config.LOGGING_CONFIG)
+    assert logging.getLogger("uvicorn.access").handlers
+
+    logging_config.configure_logging(stream=captured_logging)
+    for name in logging_config.UVICORN_LOGGERS:
+        assert logging.getLogger(name).handlers == []
+        assert logging.getLogger(name).propagate
+
+    token = request_id_var.set("req-1")
+    try:
+        access = logging.getLogger("uvicorn.access")
+        for _ in range(20):
+            access.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:5000", "GET", "/api/", "1.1", 200)
+    finally:
+        request_id_var.reset(token)
+    logging_config.shutdown_logging()
+
+    lines = [json.loads(line) for line in captured_logging.getvalue().splitlines()]
+    # Access lines are never rate limited
+    assert len(lines) == 20
+    assert lines[0]["logger"] == "uvicorn.access"
+    assert lines[0]["message"] == '127.0.0.1:5000 - "GET /api/ HTTP/1.1" 200'
+    assert lines[0]["request_id"] == "req-1"
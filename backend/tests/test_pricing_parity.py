@@ -0,0 +1,184 @@
+"""Parity between the server pricing and frontend/src/lib/pricing.js.
+
+Generated requests are priced by calculate_pricing / calculate_uk_pricing and
+by the JavaScript reference implementation running under Node with the
+served pricing model; every breakdown must match exactly.
+"""
+import json
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+PRICING_JS = Path(__file__).resolve().parents[2] / "frontend" / "src" / "lib" / "pricing.js"
+
+NODE_RUNNER = """
+import { readFileSync } from "fs";
+import { pathToFileURL } from "url";
+
+const input = JSON.parse(readFileSync(0, "utf8"));
+const pricing = await import(pathToFileURL(process.argv[1]).href);
+const model = input.model;
+
+const run = (fn) => {
+  try {
+    return fn();
+  } catch (error) {
+    return { error: error.message };
+  }
+};
+
+process.stdout.write(JSON.stringify({
+  version: pricing.PRICING_MODEL_VERSION,
+  standard: input.standard.map((request) => run(() => pricing.calculatePricing(model, request))),
+  uk: input.uk.map((request) => run(() => pricing.calculateUKPricing(model, request))),
+  round: input.round.map((value) => pricing.pyRound(value, 2)),
+}));
+"""
+
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="Node is needed to run pricing.js")
+
+
+def generate_standard_requests(rng, count):
+    countries = list(server.COUNTRY_MIN_WAGES)
+    fence_types = list(server.FENCE_DAILY_CAPACITY)
+    methods = list(server.GROUND_FIXING_COST_PER_METER) + ["Unknown Method"]
+    requests = []
+    for i in range(count):
+        meters = rng.choice([
+            float(rng.randint(1, 5000)),
+            round(rng.uniform(0.5, 5000), rng.randint(0, 3)),
+            rng.uniform(0.01, 20000),
+        ])
+        requests.append({
+            "user_name": "Parity",
+            "project_name": f"Standard {i}",
+            "country": rng.choice(countries),
+            "fence_type": rng.choice(fence_types),
+            "meters": meters,
+            "gates": rng.randint(0, 60),
+            "ground_fixing_method": rng.choice(methods),
+        })
+    return requests
+
+
+def generate_uk_requests(rng, count):
+    fence_types = list(server.UK_FENCE_PRODUCTIVITY)
+    requests = []
+    for i in range(count):
+        is_time_sensitive = rng.random() < 0.5
+        requests.append({
+            "user_name": "Parity",
+            "project_name": f"UK {i}",
+            "fence_type": rng.choice(fence_types),
+            "meters": rng.choice([float(rng.randint(0, 5000)), rng.uniform(0.01, 20000)]),
+            "gates": rng.randint(0, 60),
+            "is_time_sensitive": is_time_sensitive,
+            "days_available": rng.choice([None, 0, rng.randint(1, 90)]) if is_time_sensitive else None,
+            "num_labourers": rng.choice([None, 0, 1, rng.randint(2, 16)]),
+            "delivery_lead": rng.choice([None, "", "Lead"]),
+            "delivery_copilot": rng.choice([None, "Copilot"]),
+        })
+    return requests
+
+
+def run_node(payload):
+    result = subprocess.run(
+        ["node", "--input-type=module", "-e", NODE_RUNNER, str(PRICING_JS)],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def server_result(calculate, request_model, request):
+    calculation = calculate(request_model(**request))
+    return calculation.model_dump(exclude={"id", "timestamp"})
+
+
+@pytest.fixture(scope="module")
+def parity():
+    rng = random.Random(20261018)
+    standard = generate_standard_requests(rng, 3000)
+    uk = generate_uk_requests(rng, 3000)
+    round_values = (
+        [0.125, 0.375, 2.675, 1.005, 1.015, 0.005, 12.345, 99.995, -0.125, -2.675]
+        + [k / 1000 for k in range(0, 5000)]
+        + [rng.uniform(-1e6, 1e6) for _ in range(3000)]
+    )
+    payload = {"model": server.PRICING_MODEL, "standard": standard, "uk": uk, "round": round_values}
+    return payload, run_node(payload)
+
+
+@requires_node
+def test_pricing_model_versions_match(parity):
+    _, client = parity
+    assert client["version"] == server.PRICING_MODEL_VERSION
+
+
+@requires_node
+def test_round_matches_python(parity):
+    payload, client = parity
+    assert client["round"] == [round(value, 2) for value in payload["round"]]
+
+
+@requires_node
+def test_standard_pricing_parity(parity):
+    payload, client = parity
+    for request, client_result in zip(payload["standard"], client["standard"]):
+        expected = server_result(server.calculate_pricing, server.CalculationRequest, request)
+        assert client_result == expected, request
+
+
+@requires_node
+def test_uk_pricing_parity(parity):
+    payload, client = parity
+    for request, client_result in zip(payload["uk"], client["uk"]):
+        expected = server_result(server.calculate_uk_pricing, server.UKCalculationRequest, request)
+        assert client_result == expected, request
+
+
+@requires_node
+def test_invalid_inputs_rejected_by_both():
+    payload = {
+        "model": server.PRICING_MODEL,
+        "standard": [{"country": "Atlantis", "fence_type": "OR", "meters": 10.0, "gates": 1}],
+        "uk": [{"fence_type": "XX", "meters": 10.0, "gates": 1}],
+        "round": [],
+    }
+    client = run_node(payload)
+    assert client["standard"][0] == {"error": "Invalid country selected"}
+    assert client["uk"][0] == {"error": "Invalid fence type selected"}
+
+
+def test_pricing_model_endpoint_caching():
+    client = TestClient(server.app)
+    response = client.get("/api/pricing-model")
+    assert response.status_code == 200
+    assert response.json() == json.loads(json.dumps(server.PRICING_MODEL))
+    assert "max-age" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    revalidated = client.get("/api/pricing-model", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("header", ["{etag}", "W/{etag}", '"other", W/{etag}', "*"])
+def test_pricing_model_revalidation_matches_weakly(header):
+    client = TestClient(server.app)
+    header = header.format(etag=server.PRICING_MODEL_ETAG)
+    assert client.get("/api/pricing-model", headers={"If-None-Match": header}).status_code == 304
+
+
+def test_pricing_model_mismatched_etag_gets_body():
+    client = TestClient(server.app)
+    response = client.get("/api/pricing-model", headers={"If-None-Match": '"other", W/"stale"'})
+    assert response.status_code == 200
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+from risk import EXACT_GATE_SUM_LIMIT, sample_gate_hours, sample_work_days, summarize_risk
+
+JOB = dict(
+    meters=1000.0,
+    gates=4,
+    daily_capacity=136,
+    crew_multiplier=1,
+    crew_size=1,
+    productivity_factor=(0.7, 1.0, 1.1),
+    gate_hours=(1.5, 2.0, 4.0),
+    weather_day_rate=0.1,
+    samples=20_000,
+)
+
+
+def test_same_seed_repeats_results():
+    first = sample_work_days(**JOB, seed=7)
+    second = sample_work_days(**JOB, seed=7)
+    other = sample_work_days(**JOB, seed=8)
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+
+def test_fixed_inputs_reproduce_deterministic_days():
+    days = sample_work_days(**dict(
+        JOB, productivity_factor=(1.0, 1.0, 1.0 + 1e-12), gate_hours=(2.0, 2.0, 2.0 + 1e-12), weather_day_rate=0,
+    ), seed=1)
+    # ceil(1000 / 136 + 4 * 2 / 8 + 1) as in calculate_pricing
+    assert set(days.tolist()) == {10.0}
+
+
+@pytest.mark.parametrize("gates", [1, EXACT_GATE_SUM_LIMIT, EXACT_GATE_SUM_LIMIT + 1, 60])
+def test_gate_hours_are_independent_per_gate(gates):
+    low, mode, high = 1.5, 2.0, 4.0
+    totals = sample_gate_hours(np.random.default_rng(3), gates, (low, mode, high), 100_000)
+    variance = (low ** 2 + mode ** 2 + high ** 2 - low * mode - low * high - mode * high) / 18
+
+    assert totals.mean() == pytest.approx(gates * (low + mode + high) / 3, rel=0.01)
+    # Independent gates: variance grows with n, not n squared
+    assert totals.var() == pytest.approx(gates * variance, rel=0.05)
+    assert totals.min() >= gates * low and totals.max() <= gates * high
+
+
+def test_summary_costs_follow_duration_percentiles():
+    days = np.arange(1, 101, dtype=float)
+    summary = summarize_risk(days, fixed_cost=1000, cost_per_day=250, seed=5)
+    assert summary["samples"] == 100
+    assert summary["seed"] == 5
+    assert summary["days_p50"] <= summary["days_p80"] <= summary["days_p95"]
+    for level in ("p50", "p80", "p95"):
+        assert summary[f"cost_{level}"] == pytest.approx(1000 + 250 * summary[f"days_{level}"])
+
+
+@pytest.mark.parametrize("settings", [
+    {"gate_hours": (2.0, 1.0, 3.0)},
+    {"gate_hours": (2.0, 2.0, 2.0)},
+    {"gate_hours": (-1.0, 2.0, 3.0)},
+    {"productivity_factor": (0.0, 1.0, 1.1)},
+    {"productivity_factor": (0.9, 1.2, 1.1)},
+])
+def test_invalid_triangles_are_rejected(settings):
+    with pytest.raises(HTTPException) as error:
+        server.validate_risk_settings(server.RiskSettings(**settings))
+    assert error.value.status_code == 400
+
+
+def test_risk_summary_in_preview_breakdown():
+    request = server.UKCalculationRequest(
+        user_name="a", project_name="b", fence_type="PR", meters=1000, gates=4, risk={"samples": 10_000},
+    )
+    breakdown = server.calculate_uk_pricing(request).breakdown
+    assert breakdown.risk.samples == 10_000
+    assert breakdown.risk.days_p50 >= breakdown.work_days - 1
+    assert breakdown.risk.cost_p50 <= breakdown.risk.cost_p80 <= breakdown.risk.cost_p95
+
+
+def test_preview_endpoints_price_risk_and_cap_samples():
+    client = TestClient(server.app)
+    request = {"user_name": "a", "project_name": "b", "country": "Germany", "fence_type": "OR", "meters": 500, "gates": 2}
+
+    response = client.post("/api/calculate-preview", json=dict(request, risk={"samples": 5_000}))
+    assert response.status_code == 200
+    assert response.json()["calculation"]["breakdown"]["risk"]["samples"] == 5_000
+
+    response = client.post("/api/calculate-preview", json=dict(request, risk={"samples": 1_000_000}))
+    assert response.status_code == 422
+
+    uk_request = {"user_name": "a", "project_name": "b", "fence_type": "PR", "meters": 500, "gates": 2, "risk": {}}
+    response = client.post("/api/uk/calculate-preview", json=uk_request)
+    assert response.json()["calculation"]["breakdown"]["risk"]["samples"] == 100_000
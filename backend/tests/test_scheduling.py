@@ -0,0 +1,134 @@
+import random
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from scheduling import ScheduleJob, crew_modes, schedule_jobs
+
+
+def make_job(id, worker_days, release_day=0, due_day=None, **kwargs):
+    return ScheduleJob(
+        id=id,
+        worker_days=worker_days,
+        release_day=release_day,
+        due_day=due_day,
+        fixed_cost=450.0,
+        cost_per_man_day=275.0,
+        cost_per_day=100.0,
+        **kwargs,
+    )
+
+
+def random_jobs(count, seed, leads=("A", "B")):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        release_day = rng.randint(0, 40)
+        jobs.append(make_job(
+            str(i),
+            rng.uniform(4, 60),
+            release_day=release_day,
+            due_day=release_day + rng.randint(5, 30),
+            lead=rng.choice([None, *leads]),
+            copilot=rng.choice([None, "Copilot"]),
+        ))
+    return jobs
+
+
+def assert_no_conflicts(placements, crew_headcount):
+    end = max(p.start_day + p.work_days for p in placements)
+    usage = np.zeros(end, dtype=int)
+    busy = {}
+    for p in placements:
+        days = slice(p.start_day, p.start_day + p.work_days)
+        usage[days] += p.num_labourers
+        for person in (p.lead, p.copilot):
+            if person is not None:
+                busy.setdefault(person, np.zeros(end, dtype=int))[days] += 1
+    assert usage.max() <= crew_headcount
+    for person, days in busy.items():
+        assert days.max() <= 1, person
+
+
+def test_crew_modes_use_even_crews_within_headcount():
+    modes = crew_modes(make_job("a", 40), crew_headcount=7)
+    assert [mode[0] for mode in modes] == [2, 4, 6]
+    assert [mode[1] for mode in modes] == [20, 10, 7]
+
+
+@pytest.mark.parametrize("objective", ["makespan", "cost"])
+def test_schedule_never_overbooks_crews_or_leads(objective):
+    jobs = random_jobs(40, seed=3)
+    placements, _ = schedule_jobs(jobs, crew_headcount=8, leads=["A", "B", "C"], objective=objective, time_limit=0.5)
+
+    assert [p.job_id for p in placements] == [job.id for job in jobs]
+    assert_no_conflicts(placements, crew_headcount=8)
+    for job, p in zip(jobs, placements):
+        assert p.start_day >= job.release_day
+        if job.lead:
+            assert p.lead == job.lead
+        else:
+            assert p.lead in {"A", "B", "C"}
+
+
+def test_copilot_is_never_auto_assigned_as_lead():
+    placements, _ = schedule_jobs([make_job("a", 10, copilot="Sam")], crew_headcount=4, leads=["Sam"])
+    assert placements[0].lead is None
+    assert placements[0].copilot == "Sam"
+
+    placements, _ = schedule_jobs([make_job("a", 10, copilot="Sam")], crew_headcount=4, leads=["Sam", "Alex"])
+    assert placements[0].lead == "Alex"
+
+
+def test_late_days_count_days_past_deadline():
+    # Both jobs need the whole crew for 10 days, so one of them must wait
+    jobs = [make_job("a", 20, due_day=9), make_job("b", 20, due_day=12)]
+    placements, score = schedule_jobs(jobs, crew_headcount=2, time_limit=1)
+
+    by_id = {p.job_id: p for p in placements}
+    assert by_id["a"].start_day == 0 and by_id["a"].late_days == 0
+    assert by_id["b"].start_day == 10 and by_id["b"].late_days == 19 - 12
+    assert score[0] == 7
+
+
+def test_small_schedule_stops_before_time_limit():
+    jobs = [make_job("a", 10), make_job("b", 12)]
+    started = time.perf_counter()
+    schedule_jobs(jobs, crew_headcount=4, time_limit=2)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_large_schedule_respects_time_limit():
+    jobs = random_jobs(300, seed=5, leads=list("ABCDEFGH"))
+    started = time.perf_counter()
+    placements, _ = schedule_jobs(jobs, crew_headcount=12, leads=list("ABCDEFGH"), time_limit=0.5)
+    assert time.perf_counter() - started < 1.0
+    assert_no_conflicts(placements, crew_headcount=12)
+
+
+def test_same_seed_repeats_schedule():
+    jobs = random_jobs(12, seed=9)
+    first = schedule_jobs(jobs, crew_headcount=6, leads=["A", "B"], time_limit=5)
+    second = schedule_jobs(jobs, crew_headcount=6, leads=["A", "B"], time_limit=5)
+    assert first == second
+
+
+def test_schedule_endpoint_rejects_unknown_objective():
+    client = TestClient(server.app)
+    job = {
+        "user_name": "Planner",
+        "project_name": "Site",
+        "fence_type": "OR",
+        "meters": 100,
+        "gates": 0,
+        "earliest_start": "2026-04-01",
+    }
+    response = client.post("/api/uk/schedule", json={"jobs": [job], "crew_headcount": 4, "objective": "fastest"})
+    assert response.status_code == 422
+
+    response = client.post("/api/uk/schedule", json={"jobs": [job], "crew_headcount": 4, "objective": "cost"})
+    assert response.status_code == 200
+    assert response.json()["objective"] == "cost"
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+import snapshot
+from conftest import MemoryCollection
+from snapshot import iter_snapshot_documents, load_snapshot, snapshot_collection
+
+
+def standard_document(**overrides):
+    request = server.CalculationRequest(
+        user_name="Snapshot",
+        project_name="Site",
+        country="Germany",
+        fence_type="OR",
+        meters=250.0,
+        gates=2,
+        **overrides,
+    )
+    doc = server.calculate_pricing(request).model_dump()
+    doc["timestamp"] = doc["timestamp"].isoformat()
+    return doc
+
+
+def legacy_document():
+    # Archived before ground fixing methods, daily rates and risk existed
+    doc = standard_document()
+    del doc["ground_fixing_method"]
+    breakdown = doc["breakdown"]
+    del breakdown["daily_rate_per_man"], breakdown["risk"]
+    breakdown["ground_fixing_screws"] = breakdown.pop("ground_fixing_cost")
+    return doc
+
+
+def with_risk():
+    return standard_document(risk=server.RiskSettings(samples=1000, seed=3))
+
+
+def strip_datetimes(doc):
+    return {key: value for key, value in doc.items() if key not in ("timestamp", "archived_at")}
+
+
+def archived(doc, seconds_ago):
+    doc["archived_at"] = (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).isoformat()
+    return doc
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip_keeps_missing_and_null_fields(tmp_path, compress):
+    blank_method = standard_document()
+    blank_method["ground_fixing_method"] = None
+    docs = [legacy_document(), standard_document(), with_risk(), blank_method]
+    written = asyncio.run(snapshot_collection(MemoryCollection(docs), tmp_path, compress=compress, batch_size=2))
+    assert written == len(docs)
+
+    restored = {doc["id"]: doc for doc in iter_snapshot_documents(tmp_path)}
+    assert {doc_id: strip_datetimes(doc) for doc_id, doc in restored.items()} == {
+        doc["id"]: strip_datetimes(doc) for doc in docs
+    }
+    legacy, current, risky, _ = (restored[doc["id"]] for doc in docs)
+    assert "risk" not in legacy["breakdown"]
+    assert current["breakdown"]["risk"] is None
+    assert risky["breakdown"]["risk"]["samples"] == 1000
+    assert datetime.fromisoformat(current["timestamp"]) == datetime.fromisoformat(docs[1]["timestamp"])
+
+
+def test_restored_legacy_document_is_upgraded(tmp_path):
+    asyncio.run(snapshot_collection(MemoryCollection([legacy_document()]), tmp_path))
+    restored = next(iter_snapshot_documents(tmp_path))
+
+    calculation = server.parse_calculation(restored)
+    assert calculation.ground_fixing_method == "Angle Steel"
+    assert calculation.breakdown.ground_fixing_cost == legacy_document()["breakdown"]["ground_fixing_screws"]
+    assert calculation.breakdown.daily_rate_per_man == 0.0
+
+
+def test_late_archived_documents_are_picked_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SETTLE_SECONDS", 0)
+    collection = MemoryCollection([archived(standard_document(), seconds_ago=60)])
+    assert asyncio.run(snapshot_collection(collection, tmp_path)) == 1
+
+    # Priced long ago but only archived now, and one archived after the next run starts
+    late = standard_document()
+    late["timestamp"] = "2020-01-01T00:00:00+00:00"
+    collection.docs += [archived(late, seconds_ago=0), archived(standard_document(), seconds_ago=-60)]
+    assert asyncio.run(snapshot_collection(collection, tmp_path)) == 1
+    assert asyncio.run(snapshot_collection(collection, tmp_path)) == 0
+
+    frame = load_snapshot(tmp_path)
+    assert len(frame) == 2
+    assert frame["timestamp"].iloc[1].year == 2020
+
+
+def test_orphaned_segment_does_not_block_next_run(tmp_path):
+    # A run that crashed after writing its segment but before the manifest
+    (tmp_path / "segment-00001").mkdir(parents=True)
+    (tmp_path / "segment-00001" / "id.npy").write_bytes(b"partial")
+
+    collection = MemoryCollection([archived(standard_document(), seconds_ago=60)])
+    assert asyncio.run(snapshot_collection(collection, tmp_path, compress=False)) == 1
+    assert len(load_snapshot(tmp_path)) == 1
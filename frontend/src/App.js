@@ -11,6 +11,7 @@ import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { Separator } from "@/components/ui/separator";
 import { toast, Toaster } from "sonner";
+import { calculatePricing, PRICING_MODEL_VERSION } from "@/lib/pricing";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -90,6 +91,7 @@ const Home = ({ onLogout, onSwitchToUK }) => {
   const [selectedIds, setSelectedIds] = useState([]);
   const [deleting, setDeleting] = useState(false);
   const [showWorstCase, setShowWorstCase] = useState(false);
+  const [pricingModel, setPricingModel] = useState(null);
 
   const [formData, setFormData] = useState({
     user_name: "",
@@ -106,8 +108,20 @@ const Home = ({ onLogout, onSwitchToUK }) => {
   useEffect(() => {
     fetchCountries();
     fetchCalculations();
+    fetchPricingModel();
   }, []);
 
+  const fetchPricingModel = async () => {
+    try {
+      const response = await axios.get(`${API}/pricing-model`);
+      if (response.data.version === PRICING_MODEL_VERSION) {
+        setPricingModel(response.data);
+      }
+    } catch (error) {
+      console.error("Error fetching pricing model:", error);
+    }
+  };
+
   const fetchCountries = async () => {
     try {
       const response = await axios.get(`${API}/countries`);
@@ -151,10 +165,12 @@ const Home = ({ onLogout, onSwitchToUK }) => {
         ground_fixing_method: formData.ground_fixing_method
       };
 
-      // Calculate without saving to database
-      const response = await axios.post(`${API}/calculate-preview`, calculationData);
+      // Calculate without saving to database, locally when the pricing model is loaded
+      const calculation = pricingModel
+        ? calculatePricing(pricingModel, calculationData)
+        : (await axios.post(`${API}/calculate-preview`, calculationData)).data.calculation;
 
-      setResult(response.data.calculation);
+      setResult(calculation);
       toast.success("Calculation completed!");
     } catch (error) {
       console.error("Error calculating:", error);
@@ -171,6 +187,8 @@ const Home = ({ onLogout, onSwitchToUK }) => {
     try {
       const archiveResponse = await axios.post(`${API}/archive`, result);
       console.log("Archive response:", archiveResponse.data);
+      // The server reprices from the inputs, so show the quote as archived
+      setResult(archiveResponse.data.calculation);
 
       // Force immediate refresh of calculations
       const listResponse = await axios.get(`${API}/calculations`);
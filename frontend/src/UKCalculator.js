@@ -10,6 +10,7 @@ import { Separator } from "@/components/ui/separator";
 import { Switch } from "@/components/ui/switch";
 import { toast, Toaster } from "sonner";
 import { Checkbox } from "@/components/ui/checkbox";
+import { calculateUKPricing, PRICING_MODEL_VERSION } from "@/lib/pricing";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api/uk`;
@@ -30,6 +31,7 @@ const UKCalculator = ({ onLogout, onSwitchCalculator }) => {
   const [selectedIds, setSelectedIds] = useState([]);
   const [deleting, setDeleting] = useState(false);
   const [showWorstCase, setShowWorstCase] = useState(false);
+  const [pricingModel, setPricingModel] = useState(null);
 
   const [formData, setFormData] = useState({
     user_name: "", // Keeping for backward compatibility/archive view
@@ -49,8 +51,20 @@ const UKCalculator = ({ onLogout, onSwitchCalculator }) => {
   useEffect(() => {
     fetchFenceTypes();
     fetchCalculations();
+    fetchPricingModel();
   }, []);
 
+  const fetchPricingModel = async () => {
+    try {
+      const response = await axios.get(`${BACKEND_URL}/api/pricing-model`);
+      if (response.data.version === PRICING_MODEL_VERSION) {
+        setPricingModel(response.data);
+      }
+    } catch (error) {
+      console.error("Error fetching pricing model:", error);
+    }
+  };
+
   const fetchFenceTypes = async () => {
     try {
       const response = await axios.get(`${API}/fence-types`);
@@ -103,8 +117,11 @@ const UKCalculator = ({ onLogout, onSwitchCalculator }) => {
         num_labourers: !formData.is_time_sensitive && formData.num_labourers ? parseInt(formData.num_labourers) : null
       };
 
-      const response = await axios.post(`${API}/calculate-preview`, calculationData);
-      setResult(response.data.calculation);
+      // Price locally when the pricing model is loaded; the server is only needed to archive
+      const calculation = pricingModel
+        ? calculateUKPricing(pricingModel, calculationData)
+        : (await axios.post(`${API}/calculate-preview`, calculationData)).data.calculation;
+      setResult(calculation);
       toast.success("Calculation completed!");
     } catch (error) {
       console.error("Error calculating:", error);
@@ -119,7 +136,9 @@ const UKCalculator = ({ onLogout, onSwitchCalculator }) => {
 
     setArchiving(true);
     try {
-      await axios.post(`${API}/archive`, result);
+      // The server reprices from the inputs, so show the quote as archived
+      const archiveResponse = await axios.post(`${API}/archive`, result);
+      setResult(archiveResponse.data.calculation);
       const listResponse = await axios.get(`${API}/calculations`);
       setCalculations(listResponse.data);
       toast.success(`Archived! Total items: ${listResponse.data.length}`);
@@ -0,0 +1,167 @@
+// Client-side port of calculate_pricing and calculate_uk_pricing in
+// backend/server.py, driven by the tables from GET /api/pricing-model.
+// Operations are kept in the same order as the server so floating point
+// results match exactly; backend/tests/test_pricing_parity.py checks this.
+
+export const PRICING_MODEL_VERSION = "1";
+
+const lookup = (table, key) =>
+  Object.prototype.hasOwnProperty.call(table, key) ? table[key] : undefined;
+
+const incrementDigits = (digits) => {
+  const chars = digits.split("");
+  let i = chars.length - 1;
+  while (i >= 0 && chars[i] === "9") {
+    chars[i] = "0";
+    i -= 1;
+  }
+  if (i < 0) return `1${chars.join("")}`;
+  chars[i] = String(Number(chars[i]) + 1);
+  return chars.join("");
+};
+
+// Same result as Python's round(value, digits): the exact binary value is
+// rounded half to even, unlike Math.round or toFixed.
+export function pyRound(value, digits = 2) {
+  if (!Number.isFinite(value) || Math.abs(value) >= 1e21) return value;
+
+  const [whole, fraction] = Math.abs(value).toFixed(100).split(".");
+  const kept = whole + fraction.slice(0, digits);
+  const rest = fraction.slice(digits);
+  const restIsHalf = rest[0] === "5" && /^0*$/.test(rest.slice(1));
+  const roundUp = rest[0] > "5" || (rest[0] === "5" && !restIsHalf) ||
+    (restIsHalf && Number(kept[kept.length - 1]) % 2 === 1);
+
+  const rounded = (roundUp ? incrementDigits(kept) : kept).padStart(digits + 1, "0");
+  const result = Number(`${rounded.slice(0, -digits)}.${rounded.slice(-digits)}`);
+  return value < 0 ? -result : result;
+}
+
+const priceMultiples = (model, rawTotal) => {
+  const prices = {};
+  Object.entries(model.price_multipliers).forEach(([field, multiplier]) => {
+    prices[field] = pyRound(rawTotal * multiplier, 2);
+  });
+  return prices;
+};
+
+export function calculatePricing(model, request) {
+  const m = model.standard;
+  const groundFixingMethod = request.ground_fixing_method ?? m.default_ground_fixing_method;
+
+  let minWage = lookup(m.country_min_wages, request.country);
+  if (minWage === undefined) throw new Error("Invalid country selected");
+  const dailyCapacity = lookup(m.fence_daily_capacity, request.fence_type);
+  if (dailyCapacity === undefined) throw new Error("Invalid fence type selected");
+
+  if (minWage === 0) {
+    minWage = m.fallback_min_wage;
+  }
+
+  const fenceDays = request.meters / dailyCapacity;
+  const gateDays = request.gates * m.gate_days_per_gate;
+  const totalWorkDays = Math.ceil(fenceDays + gateDays + m.setup_cleanup_days);
+
+  const hourlyLaborRate = m.labor_rate_multiplier * minWage;
+  const dailyRatePerMan = hourlyLaborRate * m.hours_per_day;
+  const dailyLaborCost = m.crew_size * dailyRatePerMan;
+  const totalLaborCost = dailyLaborCost * totalWorkDays;
+
+  const totalToolsCost = m.tools_base_cost + m.tools_cost_per_day * totalWorkDays;
+  const totalSupervisionCost = m.supervision_cost_per_day * totalWorkDays;
+  const flightTicket = m.flight_ticket_cost;
+
+  let groundFixingRate = lookup(m.ground_fixing_cost_per_meter, groundFixingMethod);
+  if (groundFixingRate === undefined) {
+    groundFixingRate = m.ground_fixing_cost_per_meter[m.default_ground_fixing_method];
+  }
+  const groundFixingCost = request.meters * groundFixingRate;
+
+  const rawTotal = totalLaborCost + totalToolsCost + totalSupervisionCost + flightTicket + groundFixingCost;
+  const ratePerMeter = rawTotal / request.meters;
+
+  return {
+    user_name: request.user_name,
+    project_name: request.project_name,
+    country: request.country,
+    fence_type: request.fence_type,
+    meters: request.meters,
+    gates: request.gates,
+    ground_fixing_method: groundFixingMethod,
+    breakdown: {
+      work_days: totalWorkDays,
+      daily_rate_per_man: pyRound(dailyRatePerMan, 2),
+      labor_cost: pyRound(totalLaborCost, 2),
+      tools_cost: pyRound(totalToolsCost, 2),
+      supervision_cost: pyRound(totalSupervisionCost, 2),
+      flight_ticket: flightTicket,
+      ground_fixing_cost: pyRound(groundFixingCost, 2),
+      raw_total: pyRound(rawTotal, 2),
+      rate_per_meter: pyRound(ratePerMeter, 2),
+      ...priceMultiples(model, rawTotal),
+      risk: null,
+    },
+  };
+}
+
+export function calculateUKPricing(model, request) {
+  const m = model.uk;
+
+  const productivity = lookup(m.fence_productivity, request.fence_type);
+  if (productivity === undefined) throw new Error("Invalid fence type selected");
+
+  const fenceDays = request.meters / productivity;
+  const gateDays = (request.gates * m.gate_hours_per_gate) / m.hours_per_day;
+  const workerDaysNeeded = (fenceDays + gateDays + m.setup_cleanup_days) * m.productivity_crew_size;
+
+  let numLabourers;
+  if (request.is_time_sensitive && request.days_available) {
+    numLabourers = Math.ceil(workerDaysNeeded / request.days_available);
+    if (numLabourers < m.min_labourers) numLabourers = m.min_labourers;
+  } else {
+    numLabourers = request.num_labourers && request.num_labourers >= m.min_labourers
+      ? request.num_labourers
+      : m.min_labourers;
+  }
+  if (numLabourers % 2 !== 0) numLabourers += 1;
+  const totalWorkDays = Math.ceil(workerDaysNeeded / numLabourers);
+
+  const laborCost = numLabourers * m.daily_rate_per_man * totalWorkDays;
+  const totalToolsCost = m.tools_base_cost + m.tools_cost_per_day * totalWorkDays;
+  const accommodationCost = numLabourers * m.accommodation_per_day_per_man * totalWorkDays;
+  const transportationCost = m.transportation_cost;
+  const concreteCost = m.concrete_fence_types.includes(request.fence_type)
+    ? request.meters * m.concrete_cost_per_meter
+    : 0;
+
+  const rawTotal = laborCost + totalToolsCost + accommodationCost + transportationCost + concreteCost;
+  const ratePerMeter = request.meters > 0 ? rawTotal / request.meters : 0;
+
+  return {
+    calculator_type: "uk",
+    user_name: request.user_name,
+    project_name: request.project_name,
+    fence_type: request.fence_type,
+    meters: request.meters,
+    gates: request.gates,
+    delivery_lead: request.delivery_lead ? request.delivery_lead : request.user_name,
+    delivery_copilot: request.delivery_copilot ?? null,
+    is_time_sensitive: request.is_time_sensitive ?? false,
+    days_available: request.days_available ?? null,
+    num_labourers: numLabourers,
+    breakdown: {
+      work_days: totalWorkDays,
+      num_labourers: numLabourers,
+      daily_rate_per_man: m.daily_rate_per_man,
+      labor_cost: pyRound(laborCost, 2),
+      tools_cost: pyRound(totalToolsCost, 2),
+      accommodation_cost: pyRound(accommodationCost, 2),
+      transportation_cost: pyRound(transportationCost, 2),
+      concrete_cost: pyRound(concreteCost, 2),
+      raw_total: pyRound(rawTotal, 2),
+      rate_per_meter: pyRound(ratePerMeter, 2),
+      ...priceMultiples(model, rawTotal),
+      risk: null,
+    },
+  };
+}